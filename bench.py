@@ -0,0 +1,275 @@
+"""
+scan2acid benchmarks - measures every stage (parse, banner interpretation, note mapping, exports, playback
+timing) on synthetic data, without network access or MIDI hardware, and prints the results as JSON.
+
+Usage:
+    python3 bench.py                       # full run, JSON on stdout
+    python3 bench.py --quick -o bench_output.json
+    python3 bench.py --only parse,playback --hosts 2000 --ports 16 --banner-size 256
+
+Compare two versions by running the same command on each checkout and diffing the "results" sections.
+"""
+import argparse
+from importlib import metadata
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import scan2acid
+
+BANNER_TEMPLATES = {
+    21: "220 ProFTPD {version} Server (Debian) [::ffff:10.0.0.1]",
+    22: "SSH-2.0-OpenSSH_{version} Ubuntu-3ubuntu0.1",
+    25: "220 mail.lab ESMTP Postfix (Ubuntu) {version}",
+    80: "HTTP/1.1 200 OK\r\nServer: nginx/{version}\r\nContent-Type: text/html",
+    443: "HTTP/1.1 200 OK\r\nServer: Apache/{version} (Ubuntu)\r\nContent-Type: text/html",
+}
+
+SCALES_PATH = str(Path(__file__).with_name("scales.conf"))
+KEYWORDS_PATH = str(Path(__file__).with_name("keywords.conf"))
+
+class VirtualOutput:
+    """In-process stand-in for a mido output port: keeps every message with the perf_counter time it was sent."""
+
+    def __init__(self, name="bench"):
+        self.name = name
+        self.sent = []
+        self.closed = False
+
+    def send(self, message):
+        self.sent.append((time.perf_counter(), message))
+
+    def close(self):
+        self.closed = True
+
+def generate_nmap_xml(path, hosts=100, ports=16, banner_size=64, seed=0):
+    """Write a synthetic nmap -sV XML file: 'hosts' hosts with 'ports' open ports each, and product/extrainfo strings about 'banner_size' long."""
+    rng = random.Random(seed)
+    port_pool = scan2acid.TOP_PORTS_16 + list(range(1024, 10000))
+    products = ["OpenSSH", "nginx", "Apache httpd", "Microsoft IIS httpd", "Postfix smtpd", "ProFTPD", "MySQL", "Samba smbd"]
+
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write('<?xml version="1.0" encoding="UTF-8"?>\n<nmaprun scanner="nmap" args="nmap -sV --open -oX bench.xml">\n')
+        for host in range(hosts):
+            fh.write(f'<host><status state="up"/><address addr="10.{host // 65536 % 256}.{host // 256 % 256}.{host % 256}" addrtype="ipv4"/>'
+                     f'<hostnames><hostname name="host{host}.bench"/></hostnames><ports>\n')
+            for port in rng.sample(port_pool, ports):
+                product = rng.choice(products)
+                extrainfo = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz ;") for _ in range(max(0, banner_size - len(product))))
+                fh.write(f'<port protocol="tcp" portid="{port}"><state state="open" reason="syn-ack"/>'
+                         f'<service name="svc{port % 11}" product="{product}" version="{rng.randint(1, 9)}.{rng.randint(0, 40)}" extrainfo="{extrainfo}">'
+                         f'<cpe>cpe:/a:bench:{product.split()[0].lower()}</cpe></service></port>\n')
+            fh.write('</ports></host>\n')
+        fh.write('</nmaprun>\n')
+    return Path(path)
+
+def measure(function, repeat):
+    """Run 'function' 'repeat' times and summarise the wall-clock durations in seconds."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    return {
+        "repeat": repeat,
+        "min_s": min(durations),
+        "median_s": statistics.median(durations),
+        "mean_s": statistics.fmean(durations),
+        "max_s": max(durations),
+    }
+
+def bench_parse(context):
+    path = context["xml_path"]
+    result = measure(lambda: scan2acid.Parser(path).parse(), context["repeat"])
+    result["services"] = len(context["services"])
+    result["services_per_s"] = result["services"] / result["median_s"]
+    return result
+
+def bench_parse_cached(context):
+    cache = scan2acid.ParseCache(Path(context["workdir"]) / "cache")
+    scan2acid.Parser(context["xml_path"], cache=cache).parse()  # warm
+    return measure(lambda: scan2acid.Parser(context["xml_path"], cache=cache).parse(), context["repeat"])
+
+def bench_interpret_banner(context):
+    scanner = scan2acid.Scanner("127.0.0.1")
+    rng = random.Random(1)
+    banners = []
+    for _ in range(5000):
+        port = rng.choice(list(BANNER_TEMPLATES))
+        text = BANNER_TEMPLATES[port].format(version=f"{rng.randint(1, 9)}.{rng.randint(0, 30)}")
+        banners.append((port, text + "x" * max(0, context["banner_size"] - len(text))))
+
+    def run():
+        for port, banner in banners:
+            scanner._interpret_banner(port, banner)
+
+    result = measure(run, context["repeat"])
+    result["banners_per_s"] = len(banners) / result["median_s"]
+    return result
+
+def bench_to_303(context):
+    manager = scan2acid.Manager()
+    hosts = list(context["hosts"].items())
+
+    def run():
+        for host, services in hosts:
+            manager.to_303(services, name=host, scale=context["scale"], keywords_path=KEYWORDS_PATH, seed=1, verbose=False)
+        manager.sequences.clear()
+
+    result = measure(run, context["repeat"])
+    result["sequences_per_s"] = len(hosts) / result["median_s"]
+    return result
+
+def bench_build_sequences(context):
+    manager = scan2acid.Manager()
+    groups = list(context["hosts"].items())
+    result = measure(lambda: manager.build_sequences(groups, scale=context["scale"], keywords_path=KEYWORDS_PATH, seed=1), context["repeat"])
+    result["sequences_per_s"] = len(groups) / result["median_s"]
+    return result
+
+def bench_to_html(context):
+    sequence = context["sequence"]
+    directory = Path(context["workdir"]) / "html"
+    result = measure(lambda: [sequence.to_html(f"bench_{index}.html", directory=directory) for index in range(100)], context["repeat"])
+    result["pages_per_s"] = 100 / result["median_s"]
+    return result
+
+def bench_to_midi(context):
+    song = scan2acid.Song("bench", context["patterns"])
+    path = Path(context["workdir"]) / "bench.mid"
+    result = measure(lambda: song.to_midi(bpm=133, repetitions=4, filename=path), context["repeat"])
+    result["steps"] = song.length * 4
+    result["steps_per_s"] = result["steps"] / result["median_s"]
+    return result
+
+def bench_to_sysex(context):
+    patterns = context["patterns"]
+    result = measure(lambda: scan2acid.SysExBank(patterns).to_sysex(), context["repeat"])
+    result["patterns"] = len(patterns)
+    result["patterns_per_s"] = len(patterns) / result["median_s"]
+    return result
+
+def bench_playback(context):
+    """Play a sequence with MIDI clock into a VirtualOutput and compare every send with its ideal time on the clock grid."""
+    outputs = {}
+
+    def opener(name):
+        outputs[name] = VirtualOutput(name)
+        return outputs[name]
+
+    bpm = 300
+    bars = context["playback_bars"]
+    telemetry = scan2acid.PlaybackTelemetry()
+    engine = scan2acid.PlaybackEngine(bpm=bpm, send_clock=True, pool=scan2acid.PortPool(opener=opener), telemetry=telemetry)
+    engine.add(context["sequence"], midi_interface="bench", channel=0, repetitions=bars * scan2acid.BAR_STEPS // context["sequence"].length)
+
+    started = time.perf_counter()
+    engine.play(verbose=False)
+    elapsed = time.perf_counter() - started
+
+    tick_seconds = 60 / bpm / scan2acid.CLOCK_PPQ
+    clocks = [sent for sent, message in outputs["bench"].sent if message.type == 'clock']
+    origin = clocks[0]
+    errors = sorted(abs(sent - (origin + tick * tick_seconds)) * 1000 for tick, sent in enumerate(clocks))
+    return {
+        "bpm": bpm,
+        "bars": bars,
+        "seconds": elapsed,
+        "messages": len(outputs["bench"].sent),
+        "clock_error_ms": {
+            "p50": errors[len(errors) // 2],
+            "p99": errors[min(len(errors) - 1, int(len(errors) * 0.99))],
+            "max": errors[-1],
+        },
+        "telemetry": telemetry.summary(),
+    }
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "parse_cached": bench_parse_cached,
+    "interpret_banner": bench_interpret_banner,
+    "to_303": bench_to_303,
+    "build_sequences": bench_build_sequences,
+    "to_html": bench_to_html,
+    "to_midi": bench_to_midi,
+    "to_sysex": bench_to_sysex,
+    "playback": bench_playback,
+}
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=Path(__file__).parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="scan2acid benchmarks (JSON output)")
+    parser.add_argument("--only", help=f"comma-separated benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--hosts", type=int, default=500, help="hosts in the synthetic scan (default: 500)")
+    parser.add_argument("--ports", type=int, default=16, help="open ports per host (default: 16)")
+    parser.add_argument("--banner-size", type=int, default=64, help="approximate banner/product string length (default: 64)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark (default: 5)")
+    parser.add_argument("--bars", type=int, default=8, help="bars of playback for the timing benchmark (default: 8)")
+    parser.add_argument("--quick", action="store_true", help="small inputs and a single run, for smoke testing")
+    parser.add_argument("-o", "--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.hosts, args.repeat, args.bars = 50, 1, 2
+    names = [name.strip() for name in args.only.split(",")] if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory(prefix="s2a-bench-") as workdir:
+        xml_path = generate_nmap_xml(Path(workdir) / "bench.xml", hosts=args.hosts, ports=args.ports, banner_size=args.banner_size)
+        scan_parser = scan2acid.Parser(xml_path)
+        services = scan_parser.parse()
+        hosts = scan_parser.get_hosts()
+        manager = scan2acid.Manager()
+        scale = manager.choose_scale("d_minor", SCALES_PATH)
+        patterns = manager.build_sequences(list(hosts.items())[:64], scale=scale, keywords_path=KEYWORDS_PATH, seed=1)
+
+        context = {
+            "workdir": workdir,
+            "xml_path": xml_path,
+            "services": services,
+            "hosts": hosts,
+            "scale": scale,
+            "patterns": patterns,
+            "sequence": patterns[0],
+            "banner_size": args.banner_size,
+            "repeat": args.repeat,
+            "playback_bars": args.bars,
+        }
+
+        results = {}
+        for name in names:
+            print(f"running {name} ...", file=sys.stderr)
+            results[name] = BENCHMARKS[name](context)
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mido": metadata.version("mido"),
+        "parameters": {"hosts": args.hosts, "ports": args.ports, "banner_size": args.banner_size, "repeat": args.repeat, "bars": args.bars},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
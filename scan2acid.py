@@ -1,19 +1,83 @@
 import re
 import html
 import socket
+import os
+import hashlib
+import marshal
+import ipaddress
+import asyncio
+import sys
+import queue
+import threading
 import time
 import xml.etree.ElementTree as ET
 from pathlib import Path
 import mido
-from mido import Message, MidiFile, MidiTrack
+from mido import MidiFile
 from simple_term_menu import TerminalMenu
 import random
+import array
+import enum
+import collections
+import heapq
 import configparser
+import functools
+import contextlib
+import concurrent.futures
+import glob
+import argparse
+import json
+import math
+import itertools
+import io
+import mmap
+from urllib.parse import quote
 
 # change these values to adjust how the port scanning results are mapped to musical notes
 OCT_SHIFT = 36
 TIE_THRESHOLD = 30
 
+# playback timing: everything is scheduled on the 24 PPQ MIDI clock grid
+CLOCK_PPQ = 24
+CLOCK_TICKS_PER_STEP = CLOCK_PPQ // 4  # six pulses per 16th, as the TD-3 expects
+BAR_STEPS = 16  # one 4/4 bar of 16th steps; chained patterns change on these boundaries
+BAR_TICKS = BAR_STEPS * CLOCK_TICKS_PER_STEP
+SPIN_THRESHOLD = 0.002  # seconds before a deadline where we stop sleeping and busy-wait
+
+# opt-in playback telemetry (see PlaybackTelemetry)
+TELEMETRY_BUCKET_US = 50  # histogram resolution
+TELEMETRY_BUCKETS = 400  # 50 us x 400 = 20 ms; anything later lands in an overflow bucket
+TELEMETRY_LATE_MS = 1.0  # a message sent this much after its deadline counts as late
+
+# on-disk cache for parsed scans (see ParseCache)
+PARSE_CACHE_DIR = ".s2a_cache"
+PARSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# TD-3 SysEx upload pacing (see SysExBank.upload): DIN MIDI carries 31250 baud = 3125 bytes per second
+SYSEX_BYTES_PER_SECOND = 3125
+SYSEX_GAP = 0.02  # extra pause after each pattern so the device can write it to memory
+SYSEX_VERIFY_TIMEOUT = 1.0
+TD3_SYSEX_HEADER = (0xF0, 0x00, 0x20, 0x32, 0x00, 0x01, 0x0A)
+TD3_PATTERN_DUMP = 0x78
+TD3_PATTERN_REQUEST = 0x77
+
+# scan file format detection: how much of the file the SCAN_FORMATS sniffers get to see
+SCAN_SNIFF_BYTES = 4096
+
+# follow mode: how often a growing scan file is checked for new data (see ScanFollower)
+FOLLOW_POLL_INTERVAL = 0.1
+
+# event ingest server (see IngestServer): NDJSON service events over TCP/UDP
+INGEST_PORT = 5303
+INGEST_QUEUE_SIZE = 1024  # distinct pending (source, port) updates before TCP readers are paused
+
+# persistent sequence library (see SequenceLibrary)
+LIBRARY_DIR = "library"
+LIBRARY_PAGE_SIZE = 20
+
+# file extensions for batch exports, by format
+BATCH_EXTENSIONS = {"html": "html", "midi": "mid", "sysex": "syx"}
+
 # internal values for the work-in-progress port scanner
 TOP_PORTS_16 = [
     80,
@@ -34,6 +98,10 @@ TOP_PORTS_16 = [
     993,
 ]
 
+SCAN_CONCURRENCY = 64  # max simultaneous connections when scanning concurrently
+SCAN_RATE_LIMIT = 0  # max new connections per second to a single target (0 = unlimited)
+SWEEP_MAX_HOSTS = 4096  # refuse to expand target specs (CIDR ranges, lists, files) beyond this many hosts
+
 SERVICE_NAME_HINTS = {
     21: "ftp",
     22: "ssh",
@@ -61,6 +129,268 @@ BANNER_VERSION_PATTERNS = [
 ]
 
 
+def wait_until(deadline, spin=SPIN_THRESHOLD):
+    """
+    Block until the absolute time.perf_counter() value 'deadline' has been reached.
+    Sleeps while the deadline is far away and busy-waits for the last 'spin' seconds,
+    since time.sleep() alone usually overshoots by a millisecond or more.
+
+    Returns how late we are (in seconds, 0.0 or positive) once the deadline has passed.
+    """
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return -remaining
+        if remaining > spin:
+            time.sleep(remaining - spin)
+
+class DeadlineClock:
+    """
+    Absolute-deadline clock running on the MIDI clock grid (CLOCK_PPQ pulses per quarter note).
+
+    Every tick has a fixed deadline measured from a single timeline origin, instead of sleeping
+    for a relative interval after each message. Time spent building/sending messages (or a late
+    wake-up) therefore never accumulates: a late tick fires as soon as possible and the next one
+    is still scheduled against the origin, so notes and clock pulses stay phase-locked.
+
+    Usage example:
+        clock = DeadlineClock(bpm=140)
+        clock.start()
+        clock.wait_for_tick(6)  # returns at origin + one 16th note
+    """
+    def __init__(self, bpm=120, ppq=CLOCK_PPQ, spin=SPIN_THRESHOLD):
+        if bpm <= 0:
+            raise ValueError("bpm must be greater than 0")
+        self.bpm = bpm
+        self.ppq = ppq
+        self.spin = spin
+        self.tick_seconds = 60 / (bpm * ppq)
+        self.origin = None
+
+    def start(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        return self.origin
+
+    def deadline(self, tick):
+        return self.origin + tick * self.tick_seconds
+
+    def wait_for_tick(self, tick):
+        if self.origin is None:
+            raise RuntimeError("DeadlineClock.start() must be called before waiting for ticks")
+        return wait_until(self.deadline(tick), self.spin)
+
+class PlaybackTelemetry:
+    """
+    Opt-in timing instrumentation for PlaybackEngine: how far behind its deadline every note and clock
+    message actually went out.
+
+    For each kind of message ('note', 'clock') it keeps fixed-size histograms (TELEMETRY_BUCKET_US wide
+    buckets) of lateness and of jitter - the change in lateness from one message to the next - plus the
+    exact maximum, a count of late messages (over TELEMETRY_LATE_MS) and of missed clock ticks (sent
+    only after the following tick was already due). Recording is a few integer operations per message,
+    and percentiles are read from the histograms (to bucket resolution) only when a summary is asked for.
+
+    Usage example:
+        telemetry = PlaybackTelemetry()
+        seq.play(midi_interface="TD-3", bpm=133, send_clock=True, telemetry=telemetry)
+        telemetry.print_summary()
+        telemetry.export("exports/timing.json")
+    """
+    KINDS = ("note", "clock")
+
+    def __init__(self, late_ms=TELEMETRY_LATE_MS, bucket_us=TELEMETRY_BUCKET_US, buckets=TELEMETRY_BUCKETS):
+        self.late_ms = late_ms
+        self.bucket_us = bucket_us
+        self.buckets = buckets
+        self.bpm = None
+        self.tick_seconds = None
+        self.reset()
+
+    def reset(self):
+        self.lateness = {kind: array.array('Q', bytes(8 * (self.buckets + 1))) for kind in self.KINDS}
+        self.jitter = {kind: array.array('Q', bytes(8 * (self.buckets + 1))) for kind in self.KINDS}
+        self.counts = dict.fromkeys(self.KINDS, 0)
+        self.late = dict.fromkeys(self.KINDS, 0)
+        self.max_lateness = dict.fromkeys(self.KINDS, 0.0)
+        self.max_jitter = dict.fromkeys(self.KINDS, 0.0)
+        self.missed_ticks = 0
+        self._previous = dict.fromkeys(self.KINDS, None)
+
+    def start(self, clock):
+        """Called by the engine when playback starts."""
+        self.bpm = clock.bpm
+        self.tick_seconds = clock.tick_seconds
+
+    def record(self, message, deadline, sent):
+        """Account for one message sent at perf_counter() time 'sent' that was due at 'deadline'."""
+        kind = 'clock' if message.type == 'clock' else 'note'
+        lateness = max(0.0, sent - deadline)
+        self.counts[kind] += 1
+        self._add(self.lateness[kind], lateness)
+        if lateness > self.max_lateness[kind]:
+            self.max_lateness[kind] = lateness
+        if lateness * 1000 > self.late_ms:
+            self.late[kind] += 1
+        if kind == 'clock' and lateness >= self.tick_seconds:
+            self.missed_ticks += 1
+
+        previous = self._previous[kind]
+        if previous is not None:
+            jitter = abs(lateness - previous)
+            self._add(self.jitter[kind], jitter)
+            if jitter > self.max_jitter[kind]:
+                self.max_jitter[kind] = jitter
+        self._previous[kind] = lateness
+
+    def _add(self, histogram, seconds):
+        histogram[min(self.buckets, int(seconds * 1_000_000) // self.bucket_us)] += 1
+
+    def _percentile(self, histogram, fraction, maximum):
+        """Upper edge (in ms) of the bucket holding the 'fraction' quantile, capped at the exact maximum."""
+        total = sum(histogram)
+        if not total:
+            return 0.0
+        target = max(1, math.ceil(total * fraction))
+        seen = 0
+        for bucket, count in enumerate(histogram):
+            seen += count
+            if seen >= target:
+                break
+        return min((bucket + 1) * self.bucket_us / 1000, maximum * 1000)
+
+    def summary(self):
+        """Per-kind counts plus lateness/jitter p50, p99 and max in milliseconds (percentiles to bucket resolution)."""
+        summary = {"bpm": self.bpm, "late_threshold_ms": self.late_ms, "missed_ticks": self.missed_ticks}
+        for kind in self.KINDS:
+            summary[kind] = {
+                "messages": self.counts[kind],
+                "late": self.late[kind],
+                "lateness_ms": {
+                    "p50": self._percentile(self.lateness[kind], 0.50, self.max_lateness[kind]),
+                    "p99": self._percentile(self.lateness[kind], 0.99, self.max_lateness[kind]),
+                    "max": self.max_lateness[kind] * 1000,
+                },
+                "jitter_ms": {
+                    "p50": self._percentile(self.jitter[kind], 0.50, self.max_jitter[kind]),
+                    "p99": self._percentile(self.jitter[kind], 0.99, self.max_jitter[kind]),
+                    "max": self.max_jitter[kind] * 1000,
+                },
+            }
+        return summary
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f">>> Playback timing at {summary['bpm']} BPM (late = over {self.late_ms:g} ms):")
+        for kind in self.KINDS:
+            stats = summary[kind]
+            if not stats["messages"]:
+                continue
+            lateness, jitter = stats["lateness_ms"], stats["jitter_ms"]
+            print(f"  {kind:5s} {stats['messages']:6d} msgs, {stats['late']} late | "
+                  f"lateness p50 {lateness['p50']:.2f} p99 {lateness['p99']:.2f} max {lateness['max']:.2f} ms | "
+                  f"jitter p50 {jitter['p50']:.2f} p99 {jitter['p99']:.2f} max {jitter['max']:.2f} ms")
+        if self.counts['clock']:
+            print(f"  missed clock ticks: {summary['missed_ticks']}")
+
+    def export(self, filename):
+        """Write the summary plus the raw histograms (bucket_us wide, last bucket = overflow) as JSON."""
+        data = self.summary()
+        data["bucket_us"] = self.bucket_us
+        data["histograms"] = {
+            kind: {"lateness": list(self.lateness[kind]), "jitter": list(self.jitter[kind])}
+            for kind in self.KINDS
+        }
+        output_path = Path(filename)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_output(output_path) as tmp_path:
+            tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        return output_path
+
+class ConsoleLogger:
+    """
+    Buffered console output written from a background thread, so playback never blocks on the terminal.
+
+    log() only queues the text; the worker thread drains whatever has piled up and writes it in one go.
+    Call close() to flush the remaining lines and stop the thread.
+    """
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="s2a-console", daemon=True)
+        self._thread.start()
+
+    def log(self, text):
+        self._queue.put(text)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        closing = False
+        while not closing:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                closing = True
+                batch = batch[:batch.index(None)]
+
+            if batch:
+                self.stream.write("\n".join(batch) + "\n")
+                self.stream.flush()
+
+class EventSchedule:
+    """
+    Precompiled, immutable playback timeline for one pass of a sequence (see X03Sequence.compile).
+
+    - events: tuple of (tick, mido.Message), sorted by tick; ticks are CLOCK_PPQ pulses from the start of the pass
+    - ticks: length of the pass in ticks; the next pass starts at this offset
+    - pending: tie note still sounding at the end of the pass as ((sequence, step index), note), or None
+    - carried: tie note already sounding when the pass starts (the previous pass' pending), or None
+    """
+    __slots__ = ("events", "ticks", "pending", "carried")
+
+    def __init__(self, events, ticks, pending=None, carried=None):
+        self.events = tuple(events)
+        self.ticks = ticks
+        self.pending = pending
+        self.carried = carried
+
+    def __len__(self):
+        return len(self.events)
+
+    def sounding(self, position):
+        """Notes left on after sending the first 'position' events (plus any tie carried into the pass)."""
+        notes = [self.carried[1]] if self.carried is not None else []
+        for _, message in self.events[:position]:
+            if message.type == 'note_on':
+                notes.append(message.note)
+            elif message.type == 'note_off' and message.note in notes:
+                notes.remove(message.note)
+        return notes
+
+class StepType(enum.IntEnum):
+    """Compact step types. Steps store these small ints and expose them as the usual 'active'/'rest'/'tie' strings."""
+    ACTIVE = 0
+    REST = 1
+    TIE = 2
+
+STEP_TYPE_NAMES = ('active', 'rest', 'tie')
+STEP_TYPE_CODES = {name: code for code, name in enumerate(STEP_TYPE_NAMES)}
+
+def step_type_code(type):
+    if isinstance(type, StepType):
+        return int(type)
+    try:
+        return STEP_TYPE_CODES[type]
+    except (KeyError, TypeError):
+        raise ValueError(f"Unknown step type: {type}") from None
+
 class Step:
     """
     A single step in a sequence of steps. Depending on the 'type' argument, it can be:
@@ -77,14 +407,27 @@ class Step:
 
     Steps can also be individually modified after creation with the 'mod' method:
         step.mod(note=39, accent=False, type='tie', octave_mod=1)
+
+    Steps use __slots__ and keep their type as a StepType code, so large numbers of them stay small in memory.
     """
-    def __init__(self, note=30, accent=False, type='active', octave_mod=0, is_first = False, is_last = False):
+    __slots__ = ("note", "accent", "_type", "octave_mod", "source", "trigger")
+
+    def __init__(self, note=30, accent=False, type='active', octave_mod=0):
         # data section ("the payload") --------------------
         self.accent = accent
         self.note = note
         self.type = type  # 'active', 'rest', 'tie'
         self.octave_mod = octave_mod  # -1, 0, +1
         self.source = "" # where this step came from - open port, vulnerable service, whatever.
+        self.trigger = "" # accent keyword that matched the step's source, if any
+
+    @property
+    def type(self):
+        return STEP_TYPE_NAMES[self._type]
+
+    @type.setter
+    def type(self, value):
+        self._type = step_type_code(value)
 
     def __str__(self):
         return f"[STEP] -> (note={self.note}, accent={self.accent}, type={self.type}, octave_mod={self.octave_mod})"
@@ -113,13 +456,11 @@ class X03Sequence:
     such as drum machines or other synthesizers/sequencers.
     """
 
-    def __init__(self, name="X03 Sequence", length=16):
+    def __init__(self, name="X03 Sequence", length=16, host=""):
         self.name = name
         self.length = length
-        self.sequence = []
-        for i in range(length):
-            new_step = Step(is_first = True if i == 0 else False, is_last = True if i == length - 1 else False)
-            self.sequence.append(new_step)
+        self.host = host  # host the sequence was generated from, if any
+        self.sequence = [Step() for _ in range(length)]
 
     def __str__(self):
         seq_string = ""
@@ -142,182 +483,87 @@ class X03Sequence:
         else:
             raise IndexError("Step does not exist. Check your sequence length.")
 
-    def play(self, repetitions=4, midi_interface="Onyx Producer 2-2:Onyx Producer 2-2 MIDI 1 20:0", bpm=120, channel=1, send_clock=False):
-        print(f">>> Now playing: {self.name}")
-
-        quarter_note = 60 / bpm
-        sixteenth_note = quarter_note / 4
-        outport = mido.open_output(midi_interface)
-
-        last_active_note = None
-        clock_ticks_per_step = 6  # TD-3 expects 24 PPQ clock, six pulses per 16th
-        clock_message = mido.Message('clock') if send_clock else None
-
-        def advance_step():
-            if not send_clock:
-                time.sleep(sixteenth_note)
-                return
-
-            interval = sixteenth_note / clock_ticks_per_step
-            for _ in range(clock_ticks_per_step):
-                outport.send(clock_message)
-                time.sleep(interval)
-
-        if send_clock:
-            outport.send(mido.Message('start'))
-
-        iteration = 0
-        try:
-            while True:
-                if repetitions > 0 and iteration >= repetitions:
-                    break
-                print(f"[iter {iteration}] -----------------------------------------------------")
-                for j in range(self.length):
-                    step = self.sequence[j]
-
-                    if step.type == 'active':
-                        velocity = 120 if step.accent else 90
-                        note = step.note + (step.octave_mod * 12)
-                        msg_on = mido.Message('note_on', note=note, velocity=velocity, channel=channel)
-                        outport.send(msg_on)
-                        print(step, end="")
-                        advance_step()
-                        msg_off = mido.Message('note_off', note=note, velocity=0, channel=channel)
-                        outport.send(msg_off)
-                        print(" -> OFF SENT")
-
-                        if last_active_note is not None:
-                            note = last_active_note.note + (last_active_note.octave_mod * 12)
-                            msg_off = mido.Message('note_off', note=note, velocity=0, channel=channel)
-                            outport.send(msg_off)
-                            last_active_note = None
-                            print("-> OFF SENT (from tie)")
-
-                    elif step.type == 'rest':
-                        if last_active_note is not None:
-                            note = last_active_note.note + (last_active_note.octave_mod * 12)
-                            msg_off = mido.Message('note_off', note=note, velocity=0, channel=channel)
-                            outport.send(msg_off)
-                            last_active_note = None
-                            print("-> OFF SENT (from rest)")
-
-                        advance_step()
-                        print(f"{step} -> OFF SENT")
-
-                    elif step.type == 'tie':
-                        velocity = 120 if step.accent else 90
-                        note = step.note + (step.octave_mod * 12)
-                        msg_on = mido.Message('note_on', note=note, velocity=velocity, channel=channel)
-                        outport.send(msg_on)
-                        print(step)
-                        advance_step()
-
-                        if last_active_note is not None and last_active_note != step:
-                            note = last_active_note.note + (last_active_note.octave_mod * 12)
-                            msg_off = mido.Message('note_off', note=note, velocity=0, channel=channel)
-                            outport.send(msg_off)
-                            print("-> OFF SENT (from tie)")
-
-                        last_active_note = step
+    def set_source(self, index, source, trigger=""):
+        step = self.sequence[index]
+        step.source = source
+        step.trigger = trigger
+
+    def pack(self):
+        """Return a PackedX03Sequence copy of this sequence (struct-of-arrays storage, same API)."""
+        packed = PackedX03Sequence(name=self.name, length=self.length, host=self.host)
+        for index, step in enumerate(self.sequence):
+            packed.mod_step(index, note=step.note, octave_mod=step.octave_mod, type=step.type, accent=step.accent)
+            packed.set_source(index, step.source, step.trigger)
+        return packed
+
+    def compile(self, channel=1, send_clock=False, pending=None):
+        """
+        Compile one pass of the sequence into an EventSchedule: a flat, immutable timeline of
+        (tick, mido.Message) tuples on the CLOCK_PPQ grid, with every message built up front.
+
+        'pending' is the tie note still sounding when this pass starts, as ((sequence, index), note) - i.e. the
+        'pending' of the previous pass. Tie handling follows the live player: a tie keeps ringing
+        until the end of the next step, so it overlaps the following note and the 303 slides.
+        """
+        carried = pending
+        events = []
+        tick = 0
+
+        for index, step in enumerate(self.sequence):
+            end_tick = tick + CLOCK_TICKS_PER_STEP
 
-                    else:
-                        raise ValueError(f"Unknown step type: {step.type}")
+            if step.type == 'active':
+                note = step.note + (step.octave_mod * 12)
+                events.append((tick, mido.Message('note_on', note=note, velocity=120 if step.accent else 90, channel=channel)))
+                events.append((end_tick, mido.Message('note_off', note=note, velocity=0, channel=channel)))
+                if pending is not None:
+                    events.append((end_tick, mido.Message('note_off', note=pending[1], velocity=0, channel=channel)))
+                    pending = None
 
-                iteration += 1
-        except KeyboardInterrupt:
-            print("\n>>> Playback interrupted by user (Ctrl+C).")
-        finally:
-            if last_active_note is not None:
-                note = last_active_note.note + (last_active_note.octave_mod * 12)
-                outport.send(mido.Message('note_off', note=note, velocity=0, channel=channel))
+            elif step.type == 'rest':
+                if pending is not None:
+                    events.append((tick, mido.Message('note_off', note=pending[1], velocity=0, channel=channel)))
+                    pending = None
 
-            outport.send(mido.Message('control_change', control=123, value=0, channel=channel))
+            elif step.type == 'tie':
+                note = step.note + (step.octave_mod * 12)
+                events.append((tick, mido.Message('note_on', note=note, velocity=120 if step.accent else 90, channel=channel)))
+                if pending is not None and pending[0] != (self, index):
+                    events.append((end_tick, mido.Message('note_off', note=pending[1], velocity=0, channel=channel)))
+                pending = ((self, index), note)
 
-            if send_clock:
-                outport.send(mido.Message('stop'))
+            else:
+                raise ValueError(f"Unknown step type: {step.type}")
 
-            outport.close()
+            tick = end_tick
 
-    # still needs fixing. it's mostly working though!
-    def __to_midi(self, bpm=120, channel=1, ppq=480, repetitions=1, filename=None):
-        """Render the sequence into a MIDI file and optionally save it."""
+        if send_clock:
+            clock_message = mido.Message('clock')
+            events.extend((clock_tick, clock_message) for clock_tick in range(tick))
+
+        # stable sort: note events keep their order and go out before the clock pulse of the same tick
+        events.sort(key=lambda event: event[0])
+        return EventSchedule(events, tick, pending, carried)
+
+    def play(self, repetitions=4, midi_interface="Onyx Producer 2-2:Onyx Producer 2-2 MIDI 1 20:0", bpm=120, channel=1, send_clock=False, verbose=True, pool=None, telemetry=None):
+        engine = PlaybackEngine(bpm=bpm, send_clock=send_clock, pool=pool, telemetry=telemetry)
+        engine.add(self, midi_interface=midi_interface, channel=channel, repetitions=repetitions)
+        engine.play(verbose=verbose)
+
+    def to_midi(self, bpm=120, channel=0, ppq=480, repetitions=1, filename=None):
+        """
+        Render 'repetitions' passes of the sequence into a Standard MIDI File, from the same timeline the
+        live player uses (see PlaybackEngine.render). 'channel' is 0-15, as for play().
+        """
         if repetitions < 1:
             raise ValueError("repetitions must be at least 1")
 
-        ticks_per_step = max(1, round(ppq / 4))
-        midi_channel = max(0, min(15, channel - 1))
-
-        mid = MidiFile(ticks_per_beat=ppq, type=0)
-        track = MidiTrack()
-        mid.tracks.append(track)
-
-        tempo = mido.bpm2tempo(bpm)
-        track.append(mido.MetaMessage('set_tempo', tempo=tempo, time=0))
-
-        running_delta = 0
-        active_note = None
-
-        def note_on(note_value, velocity, delta):
-            track.append(Message('note_on', note=note_value, velocity=velocity, channel=midi_channel, time=delta))
-
-        def note_off(note_value, delta):
-            track.append(Message('note_off', note=note_value, velocity=0, channel=midi_channel, time=delta))
-
-        for _ in range(repetitions):
-            for step in self.sequence:
-                note_value = max(0, min(127, step.note + (step.octave_mod * 12)))
-                step_ticks = ticks_per_step
-
-                if step.type == 'rest':
-                    if active_note is not None:
-                        note_off(active_note, running_delta)
-                        running_delta = 0
-                        active_note = None
-                    running_delta += step_ticks
-                    continue
-
-                velocity = 120 if step.accent else 90
-
-                if step.type == 'active':
-                    if active_note is not None:
-                        note_off(active_note, running_delta)
-                        running_delta = 0
-                        active_note = None
-                    note_on(note_value, velocity, running_delta)
-                    active_note = note_value
-                    running_delta = 0
-                    running_delta += step_ticks
-                    continue
-
-                if step.type == 'tie':
-                    if active_note is None:
-                        note_on(note_value, velocity, running_delta)
-                        active_note = note_value
-                        running_delta = 0
-                    elif note_value != active_note:
-                        note_off(active_note, running_delta)
-                        running_delta = 0
-                        note_on(note_value, velocity, running_delta)
-                        active_note = note_value
-                        running_delta = 0
-                    running_delta += step_ticks
-                    continue
-
-                raise ValueError(f"Unknown step type: {step.type}")
-
-        if active_note is not None:
-            note_off(active_note, running_delta)
-            running_delta = 0
-
-        track.append(mido.MetaMessage('end_of_track', time=running_delta))
-
-        if filename:
-            mid.save(filename)
-
-        return mid
+        engine = PlaybackEngine(bpm=bpm)
+        engine.add(self, midi_interface=None, channel=channel, repetitions=repetitions)
+        return engine.render(filename, ppq=ppq)
 
     # still needs fixing. it's mostly working though!
-    def __to_sysex(self, group=0, pattern=0, triplet_mode=False, filename=None):
+    def to_sysex(self, group=0, pattern=0, triplet_mode=False, filename=None):
         """Return the TD-3 compatible SysEx message for this sequence."""
         if not (0 <= group <= 3):
             raise ValueError("group must be between 0 and 3")
@@ -379,7 +625,7 @@ class X03Sequence:
         step_count_msb, step_count_lsb = encode_nibble(step_count)
 
         sysex_data = [
-            0xF0, 0x00, 0x20, 0x32, 0x00, 0x01, 0x0A, 0x78,
+            *TD3_SYSEX_HEADER, TD3_PATTERN_DUMP,
             group & 0x0F,
             pattern & 0x1F,
             0x00, 0x00,
@@ -402,80 +648,986 @@ class X03Sequence:
 
         return data_bytes
 
-    def to_html(self, filename, *, title=None):
+    def to_html(self, filename, *, title=None, directory="exports"):
         """Export the sequence as an HTML table for visual inspection."""
         if not filename:
             raise ValueError("filename must be provided")
 
-        template_path = Path(__file__).with_name("template.html")
-        if not template_path.is_file():
-            raise FileNotFoundError(f"HTML template not found: {template_path}")
+        return write_html_page(Path(directory) / filename, [self], title=title or self.name)
 
+    def html_fields(self):
+        """Values for one {{#SEQUENCE}} block of template.html; BODY_ROWS is a generator so rows stream straight to the file."""
         steps = list(self.sequence)
         if not steps:
             raise ValueError("sequence contains no steps to export")
 
-        page_title = title or self.name
-        header_title = html.escape(page_title)
-        sequence_name = html.escape(self.name)
-        template = template_path.read_text(encoding="utf-8")
-
         header_cells = ['<th scope="col">Attribute</th>']
         header_cells.extend(
             f'<th scope="col">{idx}</th>'
             for idx in range(1, len(steps) + 1)
         )
-        header_html = ''.join(header_cells)
-
-        def build_row(label, values, *, row_class=""):
-            class_attr = f' class="{row_class}"' if row_class else ''
-            label_cell = f'                <th scope="row">{html.escape(label)}</th>'
-            value_cells = ''.join(
-                f'\n                <td>{value}</td>'
-                for value in values
-            )
-            return f'            <tr{class_attr}>\n{label_cell}{value_cells}\n            </tr>'
-
-        type_values = [html.escape(step.type) for step in steps]
-        base_notes = [str(step.note) for step in steps]
-        octave_mods = [str(step.octave_mod) for step in steps]
-        midi_notes = [str(step.note + (step.octave_mod * 12)) for step in steps]
-        accents = ['Yes' if step.accent else 'No' for step in steps]
-        sources = [
-            html.escape(step.source) if step.source else '&nbsp;'
-            for step in steps
-        ]
 
         row_specs = [
-            ('Type', type_values, ''),
-            ('Base Note', base_notes, ''),
-            ('Octave Mod', octave_mods, ''),
-            ('MIDI Note', midi_notes, ''),
-            ('Accent', accents, ''),
-            ('Source', sources, 'source-row'),
-        ]
-        rows = [
-            build_row(label, values, row_class=row_class)
-            for label, values, row_class in row_specs
+            ('Type', lambda step: html.escape(step.type), ''),
+            ('Base Note', lambda step: str(step.note), ''),
+            ('Octave Mod', lambda step: str(step.octave_mod), ''),
+            ('MIDI Note', lambda step: str(step.note + (step.octave_mod * 12)), ''),
+            ('Accent', lambda step: 'Yes' if step.accent else 'No', ''),
+            ('Source', lambda step: (html.escape(step.source) if step.source else '&nbsp;')
+                                    + (f'<br>({html.escape(step.trigger)})' if step.trigger else ''), 'source-row'),
         ]
-        body_rows = '\n'.join(rows)
+
+        def body_rows():
+            for row_index, (label, value, row_class) in enumerate(row_specs):
+                class_attr = f' class="{row_class}"' if row_class else ''
+                yield f'{chr(10) if row_index else ""}            <tr{class_attr}>\n                <th scope="row">{html.escape(label)}</th>'
+                for step in steps:
+                    yield f'\n                <td>{value(step)}</td>'
+                yield '\n            </tr>'
 
         max_label_len = max(len('Attribute'), *(len(label) for label, _, _ in row_specs))
-        attribute_width = f"{max_label_len + 2}ch"
-
-        html_content = (
-            template
-            .replace('{{TITLE}}', header_title)
-            .replace('{{SEQUENCE_NAME}}', sequence_name)
-            .replace('{{HEADER_CELLS}}', header_html)
-            .replace('{{BODY_ROWS}}', body_rows)
-            .replace('{{STEP_COUNT}}', str(len(steps)))
-            .replace('{{ATTRIBUTE_WIDTH}}', attribute_width)
-        )
+        return {
+            'SEQUENCE_NAME': html.escape(self.name),
+            'HEADER_CELLS': ''.join(header_cells),
+            'BODY_ROWS': body_rows(),
+            'STEP_COUNT': str(len(steps)),
+            'ATTRIBUTE_WIDTH': f"{max_label_len + 2}ch",
+        }
 
-        output_path = Path(f'exports/{filename}')
-        output_path.write_text(html_content, encoding="utf-8")
-        return output_path
+class PackedStep:
+    """
+    Lightweight view of one step of a PackedX03Sequence. It has the same attributes and 'mod' method
+    as Step, but reads and writes straight into the sequence's arrays.
+    """
+    __slots__ = ("_seq", "_index")
+
+    def __init__(self, seq, index):
+        self._seq = seq
+        self._index = index
+
+    def __str__(self):
+        return f"[STEP] -> (note={self.note}, accent={self.accent}, type={self.type}, octave_mod={self.octave_mod})"
+
+    @property
+    def note(self):
+        return self._seq.notes[self._index]
+
+    @note.setter
+    def note(self, value):
+        self._seq.notes[self._index] = value
+
+    @property
+    def accent(self):
+        return bool(self._seq.flags[self._index] & PackedX03Sequence.ACCENT_FLAG)
+
+    @accent.setter
+    def accent(self, value):
+        flags = self._seq.flags[self._index] & ~PackedX03Sequence.ACCENT_FLAG
+        self._seq.flags[self._index] = flags | (PackedX03Sequence.ACCENT_FLAG if value else 0)
+
+    @property
+    def type(self):
+        return STEP_TYPE_NAMES[self._seq.flags[self._index] & PackedX03Sequence.TYPE_MASK]
+
+    @type.setter
+    def type(self, value):
+        flags = self._seq.flags[self._index] & ~PackedX03Sequence.TYPE_MASK
+        self._seq.flags[self._index] = flags | step_type_code(value)
+
+    @property
+    def octave_mod(self):
+        return self._seq.octave_mods[self._index]
+
+    @octave_mod.setter
+    def octave_mod(self, value):
+        self._seq.octave_mods[self._index] = value
+
+    @property
+    def source(self):
+        return self._seq.sources[self._index] if self._seq.sources else ""
+
+    @source.setter
+    def source(self, value):
+        self._seq.set_source(self._index, value, self.trigger)
+
+    @property
+    def trigger(self):
+        return self._seq.triggers[self._index] if self._seq.triggers else ""
+
+    @trigger.setter
+    def trigger(self, value):
+        self._seq.set_source(self._index, self.source, value)
+
+    def mod(self, note, octave_mod, type, accent):
+        self._seq.mod_step(self._index, note=note, octave_mod=octave_mod, type=type, accent=accent)
+
+class PackedX03Sequence(X03Sequence):
+    """
+    X03Sequence with struct-of-arrays storage, for holding very large numbers of sequences (e.g. whole sweeps).
+
+    Notes live in a bytearray, type + accent in one flags byte per step and octave mods in a signed array;
+    source strings are interned and only allocated once a step actually has one. 'sequence' returns PackedStep
+    views, so mod_step(), iteration over seq.sequence and every exporter/player keep working unchanged.
+    """
+    TYPE_MASK = 0x03
+    ACCENT_FLAG = 0x04
+
+    def __init__(self, name="X03 Sequence", length=16, host=""):
+        self.name = name
+        self.length = length
+        self.host = host
+        self.notes = bytearray([30]) * length
+        self.flags = bytearray(length)  # StepType.ACTIVE, no accent
+        self.octave_mods = array.array('b', bytes(length))
+        self.sources = None
+        self.triggers = None
+
+    @property
+    def sequence(self):
+        return [PackedStep(self, index) for index in range(self.length)]
+
+    def mod_step(self, index, note, octave_mod, type, accent):
+        if not 0 <= index < self.length:
+            raise IndexError("Step does not exist. Check your sequence length.")
+        if not 0 <= note <= 127:
+            raise ValueError(f"Note {note} is outside the MIDI range 0-127.")
+        self.notes[index] = note
+        self.octave_mods[index] = octave_mod
+        self.flags[index] = step_type_code(type) | (self.ACCENT_FLAG if accent else 0)
+
+    def set_source(self, index, source, trigger=""):
+        if source and self.sources is None:
+            self.sources = [""] * self.length
+        if trigger and self.triggers is None:
+            self.triggers = [""] * self.length
+        if self.sources is not None:
+            self.sources[index] = sys.intern(source) if source else ""
+        if self.triggers is not None:
+            self.triggers[index] = sys.intern(trigger) if trigger else ""
+
+    def pack(self):
+        return self
+
+class Song:
+    """
+    An ordered list of X03Sequence patterns that is generated, exported and played as one unit.
+    Manager.to_song() builds one from a scan: one or more chained 16-step patterns per host.
+
+    Usage example:
+        song = manager.to_song(parser.get_hosts(), name="lab sweep", scale="d_minor")
+        song.to_midi(bpm=133, filename="exports/lab.mid")
+        song.play(midi_interface="TD-3", bpm=133)
+    """
+
+    def __init__(self, name="scan2acid song", patterns=None):
+        self.name = name
+        self.patterns = list(patterns or [])
+
+    def __str__(self):
+        return f"{self.name} - {len(self.patterns)} patterns, {self.length} steps:\n" + "\n".join(str(pattern) for pattern in self.patterns)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def __iter__(self):
+        return iter(self.patterns)
+
+    @property
+    def length(self):
+        return sum(pattern.length for pattern in self.patterns)
+
+    @property
+    def hosts(self):
+        return list(dict.fromkeys(pattern.host for pattern in self.patterns if pattern.host))
+
+    def flatten(self):
+        """All patterns joined into one long X03Sequence, in song order."""
+        flat = X03Sequence(name=self.name, length=self.length)
+        index = 0
+        for pattern in self.patterns:
+            for step in pattern.sequence:
+                flat.mod_step(index, note=step.note, octave_mod=step.octave_mod, type=step.type, accent=step.accent)
+                flat.set_source(index, step.source, step.trigger)
+                index += 1
+        return flat
+
+    def play(self, repetitions=1, midi_interface="Onyx Producer 2-2:Onyx Producer 2-2 MIDI 1 20:0", bpm=120, channel=1, send_clock=False, verbose=True, pool=None, telemetry=None):
+        """
+        Play every pattern in order, each one 'repetitions' times, gaplessly: one open port, one continuous
+        clock, and pattern changes on exact bar boundaries (8-step patterns play an extra pass when needed).
+        """
+        engine = PlaybackEngine(bpm=bpm, send_clock=send_clock, pool=pool, telemetry=telemetry)
+        engine.add_chain(self.patterns, midi_interface=midi_interface, channel=channel, repetitions=max(1, repetitions))
+        engine.play(verbose=verbose)
+
+    def to_midi(self, bpm=120, channel=0, ppq=480, repetitions=1, filename=None):
+        """Render the song exactly as play() would chain it (bar-aligned pattern changes, ties carried across)."""
+        engine = PlaybackEngine(bpm=bpm)
+        engine.add_chain(self.patterns, midi_interface=None, channel=channel, repetitions=max(1, repetitions))
+        return engine.render(filename, ppq=ppq)
+
+    def to_sysex(self, group=0, first_pattern=0, triplet_mode=False, filename=None):
+        """Encode the patterns into consecutive TD-3 pattern slots of one group."""
+        if first_pattern + len(self.patterns) > 16:
+            raise ValueError(f"A TD-3 group holds 16 patterns; '{self.name}' needs {len(self.patterns)} from slot {first_pattern}")
+
+        bank = SysExBank(triplet_mode=triplet_mode)
+        for index, pattern in enumerate(self.patterns):
+            bank.add(pattern, group=group, pattern=first_pattern + index)
+        return bank.to_sysex(filename)
+
+    def to_html(self, filename, *, title=None, directory="exports", single_page=False):
+        """
+        Export the song as HTML. By default each pattern gets its own page ('name.html' -> 'name_01.html',
+        'name_02.html', ...) and 'name.html' itself becomes an index linking them; with single_page=True every
+        pattern is a table of one 'name.html'. Returns the paths written, index or single page first.
+        """
+        title = title or self.name
+        if single_page:
+            return [write_html_page(Path(directory) / filename, self.patterns, title=title)]
+
+        stem, suffix = Path(filename).stem, Path(filename).suffix or ".html"
+        pages = [
+            pattern.to_html(f"{stem}_{index:02d}{suffix}", title=f"{title} - {pattern.name}", directory=directory)
+            for index, pattern in enumerate(self.patterns, start=1)
+        ]
+        entries = ((page.name, pattern.name, f"{pattern.host or 'no host'} - {pattern.length} steps") for page, pattern in zip(pages, self.patterns))
+        return [write_html_index(directory, entries, title=title, filename=f"{stem}{suffix}"), *pages]
+
+class SysExBank:
+    """
+    A TD-3 pattern bank: up to 4 groups x 16 patterns, encoded as one .syx file and/or uploaded to the device.
+
+    Sequences fill the slots in order (group 0 pattern 0, 1, ... then group 1) unless a slot is given.
+    upload() paces the messages to the DIN MIDI byte rate plus a gap per pattern, so the device's receive
+    buffer never overflows, and with an input port it reads every pattern back to verify it.
+
+    Usage example:
+        bank = SysExBank([seq1, seq2, seq3])
+        bank.to_sysex("exports/bank.syx")
+        bank.upload("TD-3", verify_interface="TD-3")
+    """
+    GROUPS = 4
+    PATTERNS = 16
+
+    def __init__(self, sequences=(), first_group=0, triplet_mode=False):
+        self.triplet_mode = triplet_mode
+        self.slots = {}
+        self._next_slot = first_group * self.PATTERNS
+        for sequence in sequences:
+            self.add(sequence)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def add(self, sequence, group=None, pattern=None):
+        """Put 'sequence' in the given slot, or in the next free one. Returns the (group, pattern) slot used."""
+        if group is None or pattern is None:
+            while self._next_slot < self.GROUPS * self.PATTERNS and divmod(self._next_slot, self.PATTERNS) in self.slots:
+                self._next_slot += 1
+            if self._next_slot >= self.GROUPS * self.PATTERNS:
+                raise ValueError(f"The bank is full ({self.GROUPS * self.PATTERNS} patterns)")
+            group, pattern = divmod(self._next_slot, self.PATTERNS)
+        if not (0 <= group < self.GROUPS and 0 <= pattern < self.PATTERNS):
+            raise ValueError(f"No such TD-3 slot: group {group}, pattern {pattern}")
+
+        self.slots[(group, pattern)] = sequence
+        return group, pattern
+
+    def messages(self):
+        """(group, pattern, sysex bytes) for every filled slot, in slot order."""
+        return [
+            (group, pattern, self.slots[(group, pattern)].to_sysex(group=group, pattern=pattern, triplet_mode=self.triplet_mode))
+            for group, pattern in sorted(self.slots)
+        ]
+
+    def to_sysex(self, filename=None):
+        """All patterns as one SysEx stream (one F0 ... F7 message per pattern), optionally saved as a .syx file."""
+        data_bytes = b"".join(message for _, _, message in self.messages())
+        if filename:
+            with open(filename, 'wb') as fh:
+                fh.write(data_bytes)
+        return data_bytes
+
+    def upload(self, midi_interface, *, gap=SYSEX_GAP, rate=SYSEX_BYTES_PER_SECOND, verify_interface=None,
+               timeout=SYSEX_VERIFY_TIMEOUT, retries=1, pool=None, verbose=True):
+        """
+        Send every pattern to the device, one message at a time: after each message we wait until its bytes
+        have left at 'rate' bytes per second, plus 'gap' seconds. With 'verify_interface' (a MIDI input) each
+        pattern is requested back and compared; mismatches are re-sent up to 'retries' times.
+        Returns a summary dict with the patterns sent, the ones that failed verification and the time taken.
+        """
+        port = pool.get(midi_interface) if pool is not None else mido.open_output(midi_interface)
+        inport = mido.open_input(verify_interface) if verify_interface else None
+        failed = []
+        started = time.perf_counter()
+        deadline = started
+
+        try:
+            for group, pattern, message in self.messages():
+                for attempt in range(retries + 1):
+                    deadline = self._send_paced(port, message, deadline, gap, rate)
+                    if inport is None:
+                        break
+                    request = bytes([*TD3_SYSEX_HEADER, TD3_PATTERN_REQUEST, group, pattern, 0xF7])
+                    deadline = self._send_paced(port, request, deadline, gap, rate)
+                    if self._read_back(inport, group, pattern, timeout) == message[len(TD3_SYSEX_HEADER) + 1:]:
+                        break
+                else:
+                    failed.append((group, pattern))
+
+                if verbose:
+                    status = "FAILED" if (group, pattern) in failed else "ok"
+                    print(f"  group {group + 1} pattern {pattern + 1:2d}: {self.slots[(group, pattern)].name} [{status}]")
+        finally:
+            if inport is not None:
+                inport.close()
+            if pool is None:
+                port.close()
+
+        elapsed = time.perf_counter() - started
+        if verbose:
+            print(f">>> Uploaded {len(self.slots) - len(failed)}/{len(self.slots)} patterns in {elapsed:.1f}s")
+        return {"sent": len(self.slots), "failed": failed, "seconds": elapsed}
+
+    @staticmethod
+    def _send_paced(port, message, deadline, gap, rate):
+        now = time.perf_counter()
+        if deadline > now:
+            time.sleep(deadline - now)
+        port.send(mido.Message('sysex', data=message[1:-1]))
+        return max(deadline, now) + len(message) / rate + gap
+
+    @staticmethod
+    def _read_back(inport, group, pattern, timeout):
+        """Payload (after header and command byte) of the device's dump of the requested slot, or None on timeout."""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            message = inport.poll()
+            if message is None:
+                time.sleep(0.001)
+                continue
+            data = bytes(message.bytes())
+            prefix = bytes([*TD3_SYSEX_HEADER, TD3_PATTERN_DUMP, group, pattern])
+            if message.type == 'sysex' and data.startswith(prefix):
+                return data[len(TD3_SYSEX_HEADER) + 1:]
+        return None
+
+class HtmlTemplate:
+    """
+    template.html compiled once into literal chunks and placeholders, so pages are written piece by piece
+    instead of running str.replace over the whole text for every field.
+
+    {{NAME}} is a field. {{#NAME}} ... {{/NAME}} is a block repeated once per entry of a list of field dicts
+    (standalone block tags take their whole line with them). A field value is a string or an iterable of
+    string chunks, which is written out as it is produced.
+    """
+    _TAG = re.compile(r"^[ \t]*\{\{([#/])(\w+)\}\}[ \t]*\r?\n|\{\{([#/]?)(\w+)\}\}", re.MULTILINE)
+
+    def __init__(self, text):
+        self.parts = self._compile(text)
+
+    @classmethod
+    def _compile(cls, text):
+        root = []
+        stack = [(None, root)]
+        position = 0
+        for match in cls._TAG.finditer(text):
+            parts = stack[-1][1]
+            if match.start() > position:
+                parts.append(text[position:match.start()])
+            position = match.end()
+
+            kind = match.group(1) or match.group(3)
+            name = match.group(2) or match.group(4)
+            if kind == '#':
+                block = []
+                parts.append((name, block))
+                stack.append((name, block))
+            elif kind == '/':
+                if stack[-1][0] != name:
+                    raise ValueError(f"Unbalanced template block: {{{{/{name}}}}}")
+                stack.pop()
+            else:
+                parts.append((name, None))
+
+        if len(stack) > 1:
+            raise ValueError(f"Unclosed template block: {{{{#{stack[-1][0]}}}}}")
+        if position < len(text):
+            root.append(text[position:])
+        return root
+
+    def render(self, fh, fields):
+        self._render(fh.write, self.parts, fields)
+
+    def _render(self, write, parts, fields):
+        for part in parts:
+            if isinstance(part, str):
+                write(part)
+                continue
+
+            name, block = part
+            value = fields.get(name, '')
+            if block is not None:
+                for entry in value:
+                    self._render(write, block, {**fields, **entry})
+            elif isinstance(value, str):
+                write(value)
+            else:
+                for chunk in value:
+                    write(chunk)
+
+@functools.lru_cache(maxsize=8)
+def _compiled_template(path, mtime_ns):
+    return HtmlTemplate(Path(path).read_text(encoding="utf-8"))
+
+def load_html_template(path=None):
+    """The compiled template.html (or 'path'), parsed once and re-read only when the file changes."""
+    template_path = Path(path) if path else Path(__file__).with_name("template.html")
+    if not template_path.is_file():
+        raise FileNotFoundError(f"HTML template not found: {template_path}")
+    return _compiled_template(str(template_path), template_path.stat().st_mtime_ns)
+
+def write_html_page(path, sequences, *, title):
+    """Write one page with a table per sequence, streamed straight to 'path' (its directory is created if needed)."""
+    template = load_html_template()
+    output_path = Path(path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as fh:
+        template.render(fh, {'TITLE': html.escape(title), 'SEQUENCE': (sequence.html_fields() for sequence in sequences)})
+    return output_path
+
+def write_html_index(directory="exports", entries=None, *, title="scan2acid exports", filename="index.html"):
+    """
+    Write 'directory/index.html' linking exported pages. 'entries' are (file name, label, details) tuples;
+    by default every other .html file in the directory is linked, labelled by its file name.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    if entries is None:
+        entries = ((path.name, path.stem, "") for path in sorted(directory.glob("*.html")) if path.name != filename)
+
+    def body_rows():
+        for row_index, (href, label, details) in enumerate(entries):
+            yield (f'{chr(10) if row_index else ""}            <tr>\n                <th scope="row"><a href="{html.escape(quote(str(href)))}">{html.escape(str(label))}</a></th>'
+                   f'\n                <td>{html.escape(str(details)) or "&nbsp;"}</td>\n            </tr>')
+
+    template = load_html_template()
+    output_path = directory / filename
+    with open(output_path, "w", encoding="utf-8") as fh:
+        template.render(fh, {'TITLE': html.escape(title), 'SEQUENCE': [{
+            'SEQUENCE_NAME': html.escape(title),
+            'HEADER_CELLS': '<th scope="col">Export</th><th scope="col">Details</th>',
+            'BODY_ROWS': body_rows(),
+            'STEP_COUNT': '1',
+            'ATTRIBUTE_WIDTH': 'minmax(12ch, 1fr)',
+        }]})
+    return output_path
+
+class Segment:
+    """One entry of a Track's pattern queue: a sequence, its compiled first/steady passes and how many passes to play (0 = forever)."""
+    __slots__ = ("sequence", "intro", "loop", "passes")
+
+    def __init__(self, sequence, intro, loop, passes):
+        self.sequence = sequence
+        self.intro = intro
+        self.loop = loop
+        self.passes = passes
+
+    @property
+    def ticks(self):
+        if self.passes <= 0:
+            return None
+        return self.intro.ticks + (self.passes - 1) * self.loop.ticks
+
+class Track:
+    """
+    A sequence (or a chain of them) scheduled by a PlaybackEngine, with its own output port and channel.
+    Tracks loop independently, so an 8-step and a 16-step sequence running together drift in and out of phase (polymeter).
+
+    A chained track plays its patterns back to back from a queue compiled up front. The tie state carries
+    across pattern changes, and with quantize=True each pattern keeps looping until it ends on a bar line
+    (BAR_STEPS steps), so the next one always starts exactly on a bar boundary.
+    """
+    def __init__(self, sequence, midi_interface, channel=1, repetitions=4, *, chain=None, quantize=False):
+        self.midi_interface = midi_interface
+        self.channel = channel
+        self.quantize = quantize
+        self.segments = []
+        self._schedule = None
+        self._position = 0
+
+        if chain is None:
+            chain = [(sequence, repetitions)]
+        pending = None
+        for chained_sequence, passes in chain:
+            if quantize and passes > 0:
+                passes = self._bar_aligned_passes(chained_sequence.length, passes)
+            intro = chained_sequence.compile(channel=channel, pending=pending)
+            loop = chained_sequence.compile(channel=channel, pending=intro.pending)
+            self.segments.append(Segment(chained_sequence, intro, loop, passes))
+            pending = loop.pending if passes > 1 else intro.pending
+            if passes <= 0:
+                break  # nothing queued after a pattern that loops forever can ever play
+
+        self._schedule = self.segments[0].intro
+
+    @staticmethod
+    def _bar_aligned_passes(length, passes):
+        aligned = passes
+        while (aligned * length) % BAR_STEPS and aligned < passes + BAR_STEPS:
+            aligned += 1
+        return aligned
+
+    @property
+    def sequence(self):
+        return self.segments[0].sequence
+
+    @property
+    def name(self):
+        if len(self.segments) == 1:
+            return self.sequence.name
+        return f"{self.sequence.name} (+{len(self.segments) - 1} chained)"
+
+    @property
+    def repetitions(self):
+        return self.segments[0].passes
+
+    @property
+    def total_ticks(self):
+        """Length of the whole track in ticks, or None if it loops forever."""
+        lengths = [segment.ticks for segment in self.segments]
+        if None in lengths:
+            return None
+        return sum(lengths)
+
+    def events(self, send, logger=None):
+        """Yield (tick, send, message) for every event of the track, ticks counted from the engine origin."""
+        base_tick = 0
+
+        for segment in self.segments:
+            steps_text = "\n".join(str(step) for step in segment.sequence.sequence)
+            schedule = segment.intro
+            iteration = 0
+
+            while segment.passes <= 0 or iteration < segment.passes:
+                if logger:
+                    logger.log(f"[iter {iteration}] {segment.sequence.name} -----------------------------------------------------\n{steps_text}")
+
+                self._schedule = schedule
+                for self._position, (tick, message) in enumerate(schedule.events):
+                    yield base_tick + tick, send, message
+
+                base_tick += schedule.ticks
+                schedule = segment.loop
+                self._schedule = schedule
+                self._position = 0
+                iteration += 1
+
+    def sounding(self):
+        """Notes this track may still be holding, used to silence it when playback stops."""
+        return self._schedule.sounding(self._position)
+
+class LiveTrack(Track):
+    """
+    A track that loops one sequence forever and can be handed a replacement while it plays.
+
+    swap() compiles the new sequence on the caller's thread and drops it into a deque (append/pop are
+    atomic, so there is no lock between the REPL and the player thread). The player only picks it up
+    when a pass ends on a bar boundary, carrying the tie state over, so the clock never stops and a
+    sliding note is not cut.
+    """
+    def __init__(self, sequence, midi_interface, channel=1):
+        super().__init__(sequence, midi_interface, channel=channel, repetitions=0)
+        self._current = self.segments[0]
+        self._handoff = collections.deque(maxlen=1)
+
+    @property
+    def name(self):
+        return self._current.sequence.name
+
+    def swap(self, sequence):
+        assumed = self._current.loop.carried
+        intro = sequence.compile(channel=self.channel, pending=assumed)
+        loop = sequence.compile(channel=self.channel, pending=intro.pending)
+        self._handoff.append((Segment(sequence, intro, loop, 0), assumed))
+
+    @property
+    def queued(self):
+        return self._handoff[0][0].sequence if self._handoff else None
+
+    def events(self, send, logger=None):
+        segment = self._current
+        schedule = segment.intro
+        base_tick = 0
+
+        while True:
+            self._schedule = schedule
+            for self._position, (tick, message) in enumerate(schedule.events):
+                yield base_tick + tick, send, message
+
+            base_tick += schedule.ticks
+            schedule = segment.loop
+
+            if self._handoff and base_tick % BAR_TICKS == 0:
+                try:
+                    next_segment, assumed = self._handoff.popleft()
+                except IndexError:
+                    next_segment = None
+                if next_segment is not None:
+                    if assumed != segment.loop.carried:
+                        # the tie state changed since swap() compiled it (another swap won the race)
+                        intro = next_segment.sequence.compile(channel=self.channel, pending=segment.loop.carried)
+                        loop = next_segment.sequence.compile(channel=self.channel, pending=intro.pending)
+                        next_segment = Segment(next_segment.sequence, intro, loop, 0)
+                    segment = next_segment
+                    self._current = segment
+                    schedule = segment.intro
+                    if logger:
+                        logger.log(f">>> Now playing: {segment.sequence.name}")
+
+            self._schedule = schedule
+            self._position = 0
+
+class BackgroundPlayer:
+    """
+    Loops a sequence on a dedicated playback thread while the REPL keeps running.
+
+    queue() hands a new sequence to the running LiveTrack, which switches to it at the next bar boundary
+    without stopping the clock. The thread asks for real-time scheduling when the OS allows it.
+
+    Usage example:
+        player = BackgroundPlayer(pool)
+        player.start(seq, midi_interface="TD-3", bpm=133, send_clock=True)
+        player.queue(next_seq)  # takes over at the next bar
+        player.stop()
+    """
+    def __init__(self, pool=None):
+        self.pool = pool
+        self.engine = None
+        self.track = None
+        self._thread = None
+
+    @property
+    def is_playing(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def now_playing(self):
+        return self.track.name if self.is_playing else None
+
+    def start(self, sequence, midi_interface, bpm=120, channel=1, send_clock=False):
+        if self.is_playing:
+            raise RuntimeError("Background playback is already running; queue() a sequence or stop() first")
+
+        self.engine = PlaybackEngine(bpm=bpm, send_clock=send_clock, pool=self.pool)
+        self.track = self.engine.add_track(LiveTrack(sequence, midi_interface, channel=channel))
+        self._thread = threading.Thread(target=self._run, name="s2a-player", daemon=True)
+        self._thread.start()
+
+    def queue(self, sequence):
+        if not self.is_playing:
+            raise RuntimeError("Background playback is not running")
+        self.track.swap(sequence)
+
+    def stop(self):
+        if self.engine is not None:
+            self.engine.stop()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(os.sched_get_priority_min(os.SCHED_FIFO)))
+        except (AttributeError, OSError):
+            pass  # no real-time scheduling here (non-Linux or not permitted); run as a normal thread
+        self.engine.play(verbose=False)
+
+class PlaybackEngine:
+    """
+    Plays any number of sequences at once on a single shared timeline and clock source.
+
+    Each track keeps its own output port, channel and length. Their precompiled timelines are merged
+    through a heap, so the engine runs one loop with one heap pop per event instead of one sleeping
+    loop per sequence. With send_clock=True a single MIDI clock (start, 24 PPQ pulses, stop) is sent
+    to every port in use. Ports come from 'pool' (a PortPool) when given and are left open for the
+    next play; otherwise the engine opens them itself and closes them when done.
+
+    Usage example:
+        engine = PlaybackEngine(bpm=133, send_clock=True)
+        engine.add(bassline, midi_interface="TD-3", channel=1, repetitions=8)
+        engine.add(drums, midi_interface="RD-6", channel=9, repetitions=16)
+        engine.play()           # or engine.render("exports/jam.mid") to write it offline
+    """
+    def __init__(self, bpm=120, send_clock=False, pool=None, telemetry=None):
+        self.bpm = bpm
+        self.send_clock = send_clock
+        self.pool = pool
+        self.telemetry = telemetry  # a PlaybackTelemetry to record send timing into, or None
+        self.tracks = []
+        self._stop_requested = threading.Event()
+
+    def add(self, sequence, midi_interface, channel=1, repetitions=4):
+        track = Track(sequence, midi_interface, channel=channel, repetitions=repetitions)
+        self.tracks.append(track)
+        return track
+
+    def add_track(self, track):
+        self.tracks.append(track)
+        return track
+
+    def stop(self):
+        """Ask a running play() (e.g. on another thread) to silence everything and return."""
+        self._stop_requested.set()
+
+    def add_chain(self, patterns, midi_interface, channel=1, repetitions=1, quantize=True):
+        """
+        Add a track that plays 'patterns' back to back (each 'repetitions' times) on one port, with no gap
+        and no clock restart between them. The pattern changes are compiled up front and, with quantize=True,
+        fall on exact bar boundaries.
+        """
+        patterns = list(patterns)
+        if not patterns:
+            raise ValueError("A chained track needs at least one pattern")
+        track = Track(None, midi_interface, channel=channel, chain=[(pattern, repetitions) for pattern in patterns], quantize=quantize)
+        self.tracks.append(track)
+        return track
+
+    def total_ticks(self):
+        """Length of the longest track in ticks, or None if any track loops forever."""
+        lengths = [track.total_ticks for track in self.tracks]
+        if not lengths or None in lengths:
+            return None
+        return max(lengths)
+
+    def _clock_events(self, ports, end_tick):
+        clock_message = mido.Message('clock')
+        senders = [port.send for port in ports]
+        tick = 0
+        while end_tick is None or tick < end_tick:
+            for send in senders:
+                yield tick, send, clock_message
+            tick += 1
+
+    def play(self, verbose=True):
+        if not self.tracks:
+            raise ValueError("PlaybackEngine has no tracks to play")
+
+        logger = ConsoleLogger() if verbose else None
+        ports = {}
+        interrupted = False
+
+        try:
+            for track in self.tracks:
+                if track.midi_interface not in ports:
+                    if self.pool is not None:
+                        ports[track.midi_interface] = self.pool.get(track.midi_interface)
+                    else:
+                        ports[track.midi_interface] = mido.open_output(track.midi_interface)
+                if logger:
+                    logger.log(f">>> Now playing: {track.name}")
+
+            end_tick = self.total_ticks()
+            sources = [track.events(ports[track.midi_interface].send, logger) for track in self.tracks]
+            if self.send_clock:
+                # clock goes last so that note events win ties on the same tick
+                sources.append(self._clock_events(ports.values(), end_tick))
+
+            heap = []
+            for order, source in enumerate(sources):
+                first = next(source, None)
+                if first is not None:
+                    heap.append([first[0], order, first[1], first[2], source])
+            heapq.heapify(heap)
+
+            clock = DeadlineClock(bpm=self.bpm)
+            if self.send_clock:
+                start_message = mido.Message('start')
+                for port in ports.values():
+                    port.send(start_message)
+            clock.start()
+
+            telemetry = self.telemetry
+            if telemetry is not None:
+                telemetry.start(clock)
+            perf_counter = time.perf_counter
+            stop_requested = self._stop_requested
+            while heap and not stop_requested.is_set():
+                entry = heap[0]
+                clock.wait_for_tick(entry[0])
+                entry[2](entry[3])
+                if telemetry is not None:
+                    telemetry.record(entry[3], clock.deadline(entry[0]), perf_counter())
+
+                upcoming = next(entry[4], None)
+                if upcoming is None:
+                    heapq.heappop(heap)
+                else:
+                    entry[0], entry[2], entry[3] = upcoming
+                    heapq.heapreplace(heap, entry)
+
+            # let the last step ring for its full length before stopping
+            if end_tick is not None and not stop_requested.is_set():
+                clock.wait_for_tick(end_tick)
+        except KeyboardInterrupt:
+            interrupted = True
+        finally:
+            self._silence(ports)
+
+            if logger:
+                logger.close()
+            if interrupted:
+                print("\n>>> Playback interrupted by user (Ctrl+C).")
+            if verbose and self.telemetry is not None:
+                self.telemetry.print_summary()
+
+    def _silence(self, ports):
+        silenced = set()
+        for track in self.tracks:
+            port = ports.get(track.midi_interface)
+            if port is None:
+                continue
+            for note in track.sounding():
+                port.send(mido.Message('note_off', note=note, velocity=0, channel=track.channel))
+            if (track.midi_interface, track.channel) not in silenced:
+                silenced.add((track.midi_interface, track.channel))
+                port.send(mido.Message('control_change', control=123, value=0, channel=track.channel))
+
+        stop_message = mido.Message('stop')
+        for port in ports.values():
+            if self.send_clock:
+                port.send(stop_message)
+            if self.pool is None:
+                port.close()
+
+    def render(self, filename=None, ppq=480):
+        """
+        Write the tracks to a type-1 Standard MIDI File as fast as they can be generated: a tempo track plus one
+        track per engine track, built from the same event timelines play() sends (clock pulses excluded).
+        Events are streamed to disk chunk by chunk and each chunk length is patched in afterwards, so memory stays
+        flat however long the render is. Returns the filename, or a mido.MidiFile when no filename is given.
+        """
+        if not self.tracks:
+            raise ValueError("PlaybackEngine has no tracks to render")
+        end_tick = self.total_ticks()
+        if end_tick is None:
+            raise ValueError("Cannot render a track that loops forever; give every track a number of repetitions")
+
+        if filename is None:
+            buffer = io.BytesIO()
+            self._write_smf(buffer, end_tick, ppq)
+            buffer.seek(0)
+            return MidiFile(file=buffer)
+
+        with open(filename, 'wb') as fh:
+            self._write_smf(fh, end_tick, ppq)
+        return filename
+
+    def _write_smf(self, fh, end_tick, ppq):
+        tempo = mido.bpm2tempo(self.bpm)
+        fh.write(b"MThd" + (6).to_bytes(4, "big") + (1).to_bytes(2, "big") + (len(self.tracks) + 1).to_bytes(2, "big") + ppq.to_bytes(2, "big"))
+
+        conductor = [(0, b"\xff\x51\x03" + tempo.to_bytes(3, "big"))]
+        self._write_track_chunk(fh, conductor, end_tick * ppq // CLOCK_PPQ)
+        for track in self.tracks:
+            self._write_track_chunk(fh, self._render_events(track, end_tick, ppq), end_tick * ppq // CLOCK_PPQ)
+
+    @staticmethod
+    def _render_events(track, end_tick, ppq):
+        name = str(track.name).encode("utf-8", "replace")
+        yield 0, b"\xff\x03" + PlaybackEngine._vlq(len(name)) + name
+
+        # schedules reuse their message objects on every pass, so each one is encoded only once
+        encoded = {}
+        for tick, _, message in track.events(None):
+            data = encoded.get(id(message))
+            if data is None:
+                data = encoded[id(message)] = bytes(message.bytes())
+            yield tick * ppq // CLOCK_PPQ, data
+
+        # a tie still ringing at the end is released where playback would silence it
+        for note in track.sounding():
+            yield end_tick * ppq // CLOCK_PPQ, bytes(mido.Message('note_off', note=note, velocity=0, channel=track.channel).bytes())
+
+    @staticmethod
+    def _write_track_chunk(fh, events, end):
+        start = fh.tell()
+        fh.write(b"MTrk\x00\x00\x00\x00")
+        length = 0
+        last = 0
+        vlq = PlaybackEngine._vlq
+        for tick, data in events:
+            chunk = vlq(tick - last) + data
+            fh.write(chunk)
+            length += len(chunk)
+            last = tick
+        chunk = vlq(max(0, end - last)) + b"\xff\x2f\x00"
+        fh.write(chunk)
+        length += len(chunk)
+
+        fh.seek(start + 4)
+        fh.write(length.to_bytes(4, "big"))
+        fh.seek(0, os.SEEK_END)
+
+    @staticmethod
+    def _vlq(value):
+        """MIDI variable-length quantity: 7 bits per byte, most significant first, high bit set on all but the last."""
+        data = bytearray([value & 0x7F])
+        value >>= 7
+        while value:
+            data.insert(0, (value & 0x7F) | 0x80)
+            value >>= 7
+        return bytes(data)
+
+class PortPool:
+    """
+    MIDI output ports that stay open and are reused across plays.
+
+    Opening an output (and, on ALSA, the first write through it) can take long enough to delay the first
+    note, so ports are opened once and handed out again on every play. Port names are enumerated once
+    and only re-read on request (names(refresh=True)). warm() opens a port ahead of time and pushes a
+    harmless All Notes Off through it, so by the time play is pressed the path to the device is hot.
+
+    Usage example:
+        pool = PortPool()
+        pool.warm("TD-3", channel=0)
+        seq.play(midi_interface="TD-3", pool=pool)
+        pool.close_all()
+    """
+    def __init__(self, opener=None):
+        self._opener = opener or mido.open_output
+        self._ports = {}
+        self._names = None
+
+    def names(self, refresh=False):
+        if self._names is None or refresh:
+            self._names = list(mido.get_output_names())
+        return list(self._names)
+
+    def get(self, name):
+        port = self._ports.get(name)
+        if port is None or getattr(port, "closed", False):
+            port = self._opener(name)
+            self._ports[name] = port
+        return port
+
+    def warm(self, name, channel=0):
+        port = self.get(name)
+        port.send(mido.Message('control_change', control=123, value=0, channel=channel))
+        return port
+
+    def release(self, name):
+        port = self._ports.pop(name, None)
+        if port is not None:
+            port.close()
+
+    def close_all(self):
+        for name in list(self._ports):
+            self.release(name)
+
+    def __contains__(self, name):
+        return name in self._ports
 
 class PortService:
     """Represents a network service exposed on a given TCP port."""
@@ -494,6 +1646,17 @@ class PortService:
         return f"[{self.port}] {self.service_name}{version_part}"
         #return f"[{self.port}] {self.service_name}{version_part}{vuln_str}{banner_part}"
 
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of as_dict(); missing keys fall back to the constructor defaults. Raises ValueError for a missing or out-of-range port."""
+        return cls(
+            port=_scan_port(data.get("port", 0)),
+            service_name=data.get("service_name", "unknown"),
+            version=data.get("version", "unknown"),
+            banner=data.get("banner", ""),
+            is_vulnerable=bool(data.get("is_vulnerable", False)),
+        )
+
     def as_dict(self):
         return {
             "port": self.port,
@@ -503,14 +1666,39 @@ class PortService:
             "is_vulnerable": self.is_vulnerable,
         }
 
+class RateLimiter:
+    """Paces coroutines to at most 'rate' acquisitions per second (used to throttle new connections per target)."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self._next_slot = 0.0
+
+    async def wait(self):
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
 class Scanner:
-    """TCP scanner that probes common ports and captures service banners."""
+    """
+    TCP scanner that probes common ports and captures service banners.
+
+    'target' is a single host, or a sweep spec: CIDR ranges, comma/space separated host lists and
+    '@path' files with one entry per line (all of them can be mixed, e.g. "10.0.0.0/28, @lab.txt").
+    Use scan() for a single host and sweep() to stream per-host results for everything in the spec.
+    """
 
     def __init__(self, target="127.0.0.1"):
         self.target = target
         self.scan_results = []
+        self.host_results = {}
+        self.sweep_errors = {}
+
+    def scan(self, *, ports=None, top_n=16, timeout=1.0, concurrent=False, concurrency=SCAN_CONCURRENCY, rate_limit=SCAN_RATE_LIMIT):
+        if concurrent:
+            return asyncio.run(self.scan_async(ports=ports, top_n=top_n, timeout=timeout, concurrency=concurrency, rate_limit=rate_limit))
 
-    def scan(self, *, ports=None, top_n=16, timeout=1.0):
         target_ip = self._resolve_target()
         selected_ports = self._select_ports(ports, top_n)
         results = []
@@ -523,6 +1711,163 @@ class Scanner:
         self.scan_results = results
         return results
 
+    async def scan_async(self, *, ports=None, top_n=16, timeout=1.0, concurrency=SCAN_CONCURRENCY, rate_limit=SCAN_RATE_LIMIT):
+        """
+        Probe all selected ports concurrently. At most 'concurrency' connections are open at once and,
+        if 'rate_limit' is set, new connections to the target are paced to that many per second.
+        Results are the same PortService list (in port order) as the sequential scan, but a sweep of
+        mostly filtered ports costs roughly one timeout instead of one timeout per port.
+        """
+        target_ip = self._resolve_target()
+        selected_ports = self._select_ports(ports, top_n)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        limiter = RateLimiter(rate_limit) if rate_limit and rate_limit > 0 else None
+
+        probes = [
+            self._probe_port_async(target_ip, port, timeout, semaphore, limiter)
+            for port in selected_ports
+        ]
+        results = [service for service in await asyncio.gather(*probes) if service]
+
+        self.scan_results = results
+        return results
+
+    def sweep(self, **scan_options):
+        """
+        Scan every host in the target spec concurrently, yielding (host, services) as each host finishes.
+        The probing runs on its own event loop thread, so the caller can already turn the first hosts into
+        sequences while the rest of the range is still being scanned. Accepts the same options as sweep_async().
+        """
+        results = queue.Queue()
+        finished = object()
+        stop = threading.Event()  # set once the caller stops iterating (break, exception, close)
+
+        def run():
+            async def pump():
+                async for item in self.sweep_async(**scan_options):
+                    results.put(item)
+
+            async def watch():
+                task = asyncio.create_task(pump())
+                while not task.done():
+                    if stop.is_set():
+                        task.cancel()  # asyncio.run() then cancels the remaining host probes
+                        break
+                    await asyncio.wait([task], timeout=0.1)
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+            try:
+                asyncio.run(watch())
+            except Exception as exc:
+                results.put(exc)
+            finally:
+                results.put(finished)
+
+        threading.Thread(target=run, name="s2a-sweep", daemon=True).start()
+
+        try:
+            while True:
+                item = results.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    async def sweep_async(self, *, ports=None, top_n=16, timeout=1.0, concurrency=SCAN_CONCURRENCY, rate_limit=SCAN_RATE_LIMIT):
+        """
+        Async generator over (host, services) for every host in the target spec, in completion order.
+        Names are resolved concurrently and 'concurrency' bounds the open connections across all hosts;
+        'rate_limit' applies to each host separately. Hosts that fail to resolve end up in sweep_errors.
+        """
+        hosts = self.expand_targets()
+        selected_ports = self._select_ports(ports, top_n)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.host_results = {}
+        self.sweep_errors = {}
+
+        async def scan_host(host):
+            try:
+                target_ip = await self._resolve_host_async(host)
+            except ValueError as exc:
+                return host, None, exc
+
+            limiter = RateLimiter(rate_limit) if rate_limit and rate_limit > 0 else None
+            probes = [
+                self._probe_port_async(target_ip, port, timeout, semaphore, limiter, host=host)
+                for port in selected_ports
+            ]
+            services = [service for service in await asyncio.gather(*probes) if service]
+            return host, services, None
+
+        for finished_host in asyncio.as_completed([scan_host(host) for host in hosts]):
+            host, services, error = await finished_host
+            if error is not None:
+                self.sweep_errors[host] = str(error)
+                continue
+
+            self.host_results[host] = services
+            yield host, services
+
+    def expand_targets(self):
+        """Expand the target spec into a de-duplicated list of hosts, keeping the order they were given in."""
+        specs = self.target if isinstance(self.target, (list, tuple, set)) else [self.target]
+        hosts = []
+        seen = set()
+
+        def add(host):
+            if host not in seen:
+                if len(hosts) >= SWEEP_MAX_HOSTS:
+                    raise ValueError(f"Target spec expands to more than {SWEEP_MAX_HOSTS} hosts")
+                seen.add(host)
+                hosts.append(host)
+
+        def expand(spec):
+            for token in re.split(r"[,\s]+", str(spec).strip()):
+                if not token:
+                    continue
+
+                if token.startswith("@"):
+                    path = Path(token[1:])
+                    if not path.is_file():
+                        raise ValueError(f"Target list file not found: {path}")
+                    for line in path.read_text(encoding="utf-8").splitlines():
+                        line = line.split("#", 1)[0].strip()
+                        if line:
+                            expand(line)
+                    continue
+
+                if "/" in token:
+                    try:
+                        network = ipaddress.ip_network(token, strict=False)
+                    except ValueError as exc:
+                        raise ValueError(f"Invalid CIDR range '{token}': {exc}") from exc
+                    if network.num_addresses > SWEEP_MAX_HOSTS + 2:
+                        raise ValueError(f"Target spec expands to more than {SWEEP_MAX_HOSTS} hosts")
+                    for address in network.hosts():
+                        add(str(address))
+                    continue
+
+                add(token)
+
+        for spec in specs:
+            expand(spec)
+
+        if not hosts:
+            raise ValueError("No targets to scan")
+        return hosts
+
+    async def _resolve_host_async(self, host):
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        except socket.gaierror as exc:
+            raise ValueError(f"Unable to resolve target '{host}': {exc}") from exc
+        return infos[0][4][0]
+
     def _resolve_target(self):
         try:
             return socket.gethostbyname(self.target)
@@ -559,14 +1904,78 @@ class Scanner:
         except (socket.timeout, ConnectionRefusedError, OSError):
             return None
 
-    def _grab_banner(self, sock, port):
-        banner = self._recv_banner(sock)
+    async def _probe_port_async(self, target_ip, port, timeout, semaphore, limiter=None, *, host=None):
+        async with semaphore:
+            if limiter:
+                await limiter.wait()
+
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(target_ip, port), timeout)
+            except (asyncio.TimeoutError, OSError):
+                return None
+
+            try:
+                banner = await self._grab_banner_async(reader, writer, port, timeout, host=host)
+            finally:
+                writer.close()
+                try:
+                    await asyncio.wait_for(writer.wait_closed(), timeout)
+                except (asyncio.TimeoutError, OSError):
+                    pass
+
+        service_name, version = self._interpret_banner(port, banner)
+        return PortService(port=port, service_name=service_name, version=version, banner=banner)
+
+    async def _grab_banner_async(self, reader, writer, port, timeout, *, host=None):
+        banner = await self._recv_banner_async(reader, timeout)
         if banner:
             return banner
 
-        for probe in self._build_probes(port):
+        for probe in self._build_probes(port, host=host):
             try:
-                sock.sendall(probe)
+                writer.write(probe)
+                await asyncio.wait_for(writer.drain(), timeout)
+            except (asyncio.TimeoutError, OSError):
+                break
+
+            banner = await self._recv_banner_async(reader, timeout)
+            if banner:
+                return banner
+
+        return ""
+
+    async def _recv_banner_async(self, reader, timeout, chunk_size=4096, max_reads=2):
+        data_parts = []
+        reads = 0
+
+        while reads < max_reads:
+            reads += 1
+            try:
+                chunk = await asyncio.wait_for(reader.read(chunk_size), timeout)
+            except (asyncio.TimeoutError, OSError):
+                break
+
+            if not chunk:
+                break
+
+            data_parts.append(chunk)
+            if len(chunk) < chunk_size:
+                break
+
+        if not data_parts:
+            return ""
+
+        data = b"".join(data_parts)
+        return data.decode("utf-8", errors="ignore").strip()
+
+    def _grab_banner(self, sock, port):
+        banner = self._recv_banner(sock)
+        if banner:
+            return banner
+
+        for probe in self._build_probes(port):
+            try:
+                sock.sendall(probe)
             except OSError:
                 break
 
@@ -600,8 +2009,8 @@ class Scanner:
         data = b"".join(data_parts)
         return data.decode("utf-8", errors="ignore").strip()
 
-    def _build_probes(self, port):
-        host = self.target
+    def _build_probes(self, port, host=None):
+        host = host or self.target
         http_probe = (
             f"HEAD / HTTP/1.0\r\nHost: {host}\r\nUser-Agent: scan2acid/0.1\r\nConnection: close\r\n\r\n".encode("ascii")
         )
@@ -676,55 +2085,241 @@ class Scanner:
 
         return text.lower(), "unknown"
 
+class ParseCache:
+    """
+    On-disk cache of parsed scans, so reloading the same files is near-instant.
+
+    Entries are keyed by the resolved path, size and mtime of the scan file (or by a hash of its
+    content with hash_content=True) plus the scan format it was read as, and stored as compact marshal-encoded tuples, one file per scan.
+    Once the cache grows over 'max_bytes', the least recently used entries are evicted.
+
+    Usage example:
+        cache = ParseCache()
+        services = Parser("scans/lab.xml", cache=cache).parse()
+        print(cache.stats())
+    """
+    MAGIC = b"S2AC2\n"  # bumped whenever the readers change what a parse returns
+
+    def __init__(self, directory=PARSE_CACHE_DIR, max_bytes=PARSE_CACHE_MAX_BYTES, *, hash_content=False):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hash_content = hash_content
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, path, scan_format=""):
+        path = Path(path).resolve()
+        if self.hash_content:
+            digest = hashlib.sha1(f"{scan_format}\0".encode("utf-8"))
+            with open(path, "rb") as fh:
+                for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            return digest.hexdigest()
+
+        stat = path.stat()
+        return hashlib.sha1(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0{scan_format}".encode("utf-8")).hexdigest()
+
+    def get(self, path, scan_format=""):
+        """Return the cached {host: [PortService]} for the scan file read as 'scan_format', or None on a miss."""
+        entry = self.directory / f"{self.key(path, scan_format)}.s2a"
+        try:
+            data = entry.read_bytes()
+            if not data.startswith(self.MAGIC):
+                raise ValueError("unknown cache entry format")
+            hosts = {
+                host: [
+                    PortService(port=port, service_name=service_name, version=version, banner=banner, is_vulnerable=is_vulnerable)
+                    for port, service_name, version, banner, is_vulnerable in services
+                ]
+                for host, services in marshal.loads(data[len(self.MAGIC):])
+            }
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (ValueError, EOFError, TypeError):
+            entry.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        os.utime(entry)  # mark as recently used
+        self.hits += 1
+        return hosts
+
+    def put(self, path, hosts, scan_format=""):
+        payload = tuple(
+            (host, tuple((service.port, service.service_name, service.version, service.banner, service.is_vulnerable) for service in services))
+            for host, services in hosts.items()
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = self.directory / f"{self.key(path, scan_format)}.s2a"
+        tmp_entry = entry.with_suffix(".tmp")
+        tmp_entry.write_bytes(self.MAGIC + marshal.dumps(payload))
+        os.replace(tmp_entry, entry)
+        self.evict()
+
+    def evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for entry, size, _ in sorted(entries, key=lambda item: item[2]):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        """Invalidate the whole cache. Returns the number of entries removed."""
+        entries = self._entries()
+        for entry, _, _ in entries:
+            entry.unlink(missing_ok=True)
+        return len(entries)
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    def _entries(self):
+        if not self.directory.is_dir():
+            return []
+        entries = []
+        for entry in self.directory.glob("*.s2a"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((entry, stat.st_size, stat.st_mtime))
+        return entries
+
 class Parser:
-    def __init__(self, xml_path=None):
+    def __init__(self, xml_path=None, *, cache=None, format=None):
         self.name = "scan2acid parser"
         self.xml_path = Path(xml_path) if xml_path else None
+        self.cache = cache
+        self.format = format  # a SCAN_FORMATS name, or None to detect it from the file
         self._services = []
+        self._hosts = {}
 
     def parse(self, xml_path=None):
-        path = self._resolve_path(xml_path)
-        root = ET.parse(path).getroot()
-        services = []
-
-        for host in root.findall("host"):
-            ports_el = host.find("ports")
-            if ports_el is None:
+        if self.cache is not None:
+            path = self._resolve_path(xml_path)
+            scan_format = self.format or detect_scan_format(path)
+            hosts = self.cache.get(path, scan_format)
+            if hosts is not None:
+                self._hosts = hosts
+                self._services = [service for services in hosts.values() for service in services]
+                return list(self._services)
+
+        hosts = {}
+        host_ports = {}
+
+        for host, host_services in self.iter_hosts(xml_path):
+            if host not in hosts:
+                hosts[host] = host_services
                 continue
+            # line-based formats can report a host again (masscan writes banners long after the open port)
+            by_port = host_ports.get(host)
+            if by_port is None:
+                by_port = host_ports[host] = {service.port: service for service in hosts[host]}
+            for service in host_services:
+                if service.port in by_port:
+                    _merge_service(by_port[service.port], service)
+                else:
+                    by_port[service.port] = service
+                    hosts[host].append(service)
+        services = [service for host_services in hosts.values() for service in host_services]
 
-            for port_el in ports_el.findall("port"):
-                service = self._parse_port_element(port_el)
-                if service:
-                    services.append(service)
+        if self.cache is not None:
+            self.cache.put(path, hosts, scan_format)
 
+        self._hosts = hosts
         self._services = services
         return services
 
+    def iter_hosts(self, xml_path=None):
+        """
+        Stream the scan file host by host, yielding (host, services) for every host with open ports.
+        The file is read by the SCAN_FORMATS reader for self.format, or for the detected format.
+        Line-based formats yield a host again each time it shows up (parse() merges them).
+        """
+        path = self._resolve_path(xml_path)
+        scan_format = self.format or detect_scan_format(path)
+        if scan_format not in SCAN_FORMATS:
+            raise ValueError(f"Unknown scan format '{scan_format}'. Available formats: {', '.join(SCAN_FORMATS)}")
+        return SCAN_FORMATS[scan_format][0](path)
+
+    def _iter_nmap_xml(self, path):
+        """
+        Read nmap XML host by host. Built on iterparse: each <host> element is cleared as soon as it has been processed, so memory
+        stays flat no matter how big the scan is and callers can start generating sequences before the
+        whole file has been read.
+        """
+        root = None
+
+        for event, element in ET.iterparse(path, events=("start", "end")):
+            if root is None:
+                root = element
+            if event != "end" or element.tag != "host":
+                continue
+
+            services = []
+            ports_el = element.find("ports")
+            if ports_el is not None:
+                for port_el in ports_el.findall("port"):
+                    service = self._parse_port_element(port_el)
+                    if service:
+                        services.append(service)
+
+            host = self._host_address(element)
+            element.clear()
+            root.clear()
+
+            if services:
+                yield host, services
+
     def get_services(self):
         return list(self._services)
 
+    def get_hosts(self):
+        return {host: list(services) for host, services in self._hosts.items()}
+
     def services_as_dicts(self):
         return [service.as_dict() for service in self._services]
 
     def _resolve_path(self, xml_path):
         candidate = xml_path or self.xml_path
         if candidate is None:
-            raise ValueError("Parser.parse requires an XML path")
+            raise ValueError("Parser.parse requires a scan file path")
 
         path = Path(candidate)
         if not path.is_file():
-            raise FileNotFoundError(f"XML file not found: {path}")
+            raise FileNotFoundError(f"Scan file not found: {path}")
 
         self.xml_path = path
         return path
 
+    def _host_address(self, host_el):
+        addresses = {address.get("addrtype"): address.get("addr") for address in host_el.findall("address")}
+        for addrtype in ("ipv4", "ipv6", "mac"):
+            if addresses.get(addrtype):
+                return addresses[addrtype]
+
+        hostname_el = host_el.find("hostnames/hostname")
+        if hostname_el is not None and hostname_el.get("name"):
+            return hostname_el.get("name")
+        return "unknown"
+
     def _parse_port_element(self, port_el):
         state_el = port_el.find("state")
         if state_el is None or state_el.get("state") != "open":
             return None
 
         try:
-            port_number = int(port_el.get("portid", 0))
+            port_number = _scan_port(port_el.get("portid", 0))
         except (TypeError, ValueError):
             return None
 
@@ -765,10 +2360,752 @@ class Parser:
 
         return PortService(port=port_number, service_name=service_name, version=version, banner=banner)
 
+SCAN_FORMATS = {}
+
+def register_scan_format(name, *, suffixes=(), sniff=None):
+    """
+    Register a scan file reader under 'name'. The decorated function takes a path and yields (host, [PortService]).
+    'sniff' gets the first SCAN_SNIFF_BYTES of a file and says whether it is in this format; formats are sniffed
+    in registration order, and 'suffixes' are the fallback when no sniffer recognises the file.
+    """
+    def decorator(reader):
+        SCAN_FORMATS[name] = (reader, tuple(suffixes), sniff)
+        return reader
+    return decorator
+
+def detect_scan_format(path):
+    with open(path, "rb") as fh:
+        head = fh.read(SCAN_SNIFF_BYTES)
+    for name, (_, _, sniff) in SCAN_FORMATS.items():
+        if sniff is not None and sniff(head):
+            return name
+    suffix = Path(path).suffix.lower()
+    for name, (_, suffixes, _) in SCAN_FORMATS.items():
+        if suffix in suffixes:
+            return name
+    raise ValueError(f"Cannot tell the format of {path}. Known formats: {', '.join(SCAN_FORMATS)}")
+
+def _first_line(head):
+    return head.lstrip().split(b"\n", 1)[0].strip()
+
+def _group_by_host(pairs):
+    """Turn a stream of (host, service) into (host, [services]) for each run of lines about the same host."""
+    for host, group in itertools.groupby(pairs, key=lambda pair: pair[0]):
+        yield host, [service for _, service in group]
+
+def _scan_port(value):
+    """A port field from a scan file or event as an int; raises ValueError unless it is in 1-65535."""
+    port = int(value)
+    if not 0 < port < 65536:
+        raise ValueError(f"port {port} is out of range (1-65535)")
+    return port
+
+def _hinted_service(port, name=""):
+    if not name or name == "unknown":
+        return SERVICE_NAME_HINTS.get(port, "unknown")
+    return name
+
+def _merge_service(service, other):
+    """Fold a second report of the same host and port into 'service': a real service name or banner fills in a guessed/missing one."""
+    if other.service_name != _hinted_service(other.port) and service.service_name == _hinted_service(service.port):
+        service.service_name = other.service_name
+    if service.version == "unknown":
+        service.version = other.version
+    if not service.banner:
+        service.banner = other.banner
+
+@register_scan_format("nmap-xml", suffixes=(".xml",), sniff=lambda head: head.lstrip().startswith((b"<?xml", b"<nmaprun")) and b"<nmaprun" in head)
+def read_nmap_xml(path):
+    """nmap -oX output."""
+    return Parser()._iter_nmap_xml(path)
+
+@register_scan_format("nmap-grepable", suffixes=(".gnmap",), sniff=lambda head: (head.startswith(b"# Nmap") and b"\nHost: " in head) or _first_line(head).startswith(b"Host: "))
+def read_nmap_grepable(path):
+    """
+    nmap -oG output: one 'Host: <ip> (<name>)<TAB>Ports: <port>/<state>/<proto>/<owner>/<service>/<rpc>/<version>/, ...'
+    line per host. The version field is nmap's "product version (extrainfo)"; it is turned into the
+    "product version extrainfo" string the XML parser builds.
+    """
+    port_entry = re.compile(rb"(\d+)/([^/]*)/[^/]*/[^/]*/([^/]*)/[^/]*/([^/]*)/")
+    extrainfo = re.compile(r"^(.*?) ?\((.*)\)$")
+    with open(path, "rb") as fh:
+        for line in fh:
+            if not line.startswith(b"Host: ") or b"\tPorts: " not in line:
+                continue
+            host = line[6:].split(None, 1)[0].decode("utf-8", "replace")
+            ports_field = line.split(b"\tPorts: ", 1)[1].split(b"\t", 1)[0]
+
+            services = []
+            for port, state, service_name, version in port_entry.findall(ports_field):
+                if state != b"open":
+                    continue
+                try:
+                    port = _scan_port(port)
+                except ValueError:
+                    continue
+                version = extrainfo.sub(lambda match: " ".join(part for part in match.groups() if part), version.decode("utf-8", "replace").strip())
+                services.append(PortService(
+                    port=port,
+                    service_name=_hinted_service(port, service_name.decode("utf-8", "replace")),
+                    version=version or "unknown",
+                ))
+            if services:
+                yield host, services
+
+@register_scan_format("masscan-list", suffixes=(".lst",), sniff=lambda head: head.startswith(b"#masscan"))
+def read_masscan_list(path):
+    """
+    masscan -oL output: 'open tcp <port> <ip> <time>' lines, plus 'banner tcp <port> <ip> <time> <service> <banner>'.
+    The open and banner records of a port become a single service.
+    """
+    # the hottest format (multi-million-line sweeps), so hosts are grouped inline and compared as raw bytes
+    hints = SERVICE_NAME_HINTS
+    current = None
+    host = None
+    services = {}
+    with open(path, "rb") as fh:
+        for line in fh:
+            fields = line.split(None, 5)
+            if len(fields) < 5 or fields[0] not in (b"open", b"banner"):
+                continue
+            if fields[3] != current:
+                if services:
+                    yield host, list(services.values())
+                current = fields[3]
+                host = current.decode("ascii", "replace")
+                services = {}
+
+            try:
+                port = _scan_port(fields[2])
+            except ValueError:
+                continue
+            if fields[0] == b"open":
+                if port not in services:
+                    services[port] = PortService(port=port, service_name=hints.get(port, "unknown"))
+            elif len(fields) == 6:
+                name, _, banner = fields[5].decode("utf-8", "replace").partition(" ")
+                service = PortService(port=port, service_name=_hinted_service(port, name), banner=banner)
+                if port in services:
+                    _merge_service(services[port], service)
+                else:
+                    services[port] = service
+    if services:
+        yield host, list(services.values())
+
+@register_scan_format("masscan-json", suffixes=(".json",), sniff=lambda head: _first_line(head) == b"[" or (_first_line(head).startswith(b"{") and b'"ip"' in _first_line(head)))
+def read_masscan_json(path):
+    """
+    masscan -oJ (or -oD) output. masscan writes one record per line, so the file is read line by line instead
+    of being loaded as one JSON document: '{"ip": ..., "ports": [{"port": 80, "status": "open", ...}]}', where
+    banner records carry "service": {"name": ..., "banner": ...} instead of a status. The open and banner
+    records of a port become a single service.
+    """
+    def entries():
+        with open(path, "rb") as fh:
+            for line_number, line in enumerate(fh, start=1):
+                line = line.strip().strip(b",")
+                if not line or line in (b"[", b"]"):
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    raise ValueError(f"{path}:{line_number}: not a masscan JSON record") from None
+
+                host = record.get("ip", "unknown")
+                for entry in record.get("ports", ()):
+                    if entry.get("status", "open") != "open":
+                        continue
+                    try:
+                        port = _scan_port(entry["port"])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    service = entry.get("service") or {}
+                    yield host, PortService(port=port, service_name=_hinted_service(port, service.get("name", "")), banner=service.get("banner", ""))
+
+    for host, services in _group_by_host(entries()):
+        by_port = {}
+        for service in services:
+            if service.port in by_port:
+                _merge_service(by_port[service.port], service)
+            else:
+                by_port[service.port] = service
+        yield host, list(by_port.values())
+
+def jsonl_services(record):
+    """(host, PortService) pairs of one native JSONL record: a service with a "host", or {"host": ..., "services": [...]}."""
+    host = str(record.get("host") or "unknown")
+    if "services" in record:
+        return [(host, PortService.from_dict(service)) for service in record["services"]]
+    return [(host, PortService.from_dict(record))]
+
+@register_scan_format("jsonl", suffixes=(".jsonl", ".ndjson"), sniff=lambda head: _first_line(head).startswith(b"{"))
+def read_jsonl(path):
+    """scan2acid's own line format (see 'parse --jsonl' and ScanFollower): one JSON object per line."""
+    def entries():
+        with open(path, "rb") as fh:
+            for line_number, line in enumerate(fh, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield from jsonl_services(json.loads(line))
+                except (ValueError, TypeError, AttributeError):
+                    raise ValueError(f"{path}:{line_number}: not a scan2acid JSONL record") from None
+
+    return _group_by_host(entries())
+
+class ScanFollower:
+    """
+    Tails a scan file that is still being written and returns every open port as soon as it is complete.
+
+    nmap XML goes through an XMLPullParser fed only with the bytes appended since the last poll: a <port>
+    is reported when its closing tag arrives (the host address comes earlier in the same <host>), and each
+    <host> is cleared once it ends. Files ending in .jsonl/.ndjson hold one JSON object per line, either a
+    service ({"host": ..., "port": ..., "service_name": ...}) or a whole host ({"host": ..., "services": [...]}).
+    Nothing is ever re-read; if the file shrinks (a new scan reusing the name), it is followed from the start.
+
+    Usage example:
+        follower = ScanFollower("scans/live.xml")
+        for updates in follower.follow():
+            for host, service in updates:
+                print(host, service)
+    """
+    JSONL_SUFFIXES = {".jsonl", ".ndjson"}
+
+    def __init__(self, path, *, poll_interval=FOLLOW_POLL_INTERVAL):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self.jsonl = self.path.suffix.lower() in self.JSONL_SUFFIXES
+        self.errors = 0
+        self._ports = Parser()
+        self._reset()
+
+    def _reset(self):
+        self._offset = 0
+        self._pending = b""
+        self._pull = ET.XMLPullParser(events=("start", "end"))
+        self._root = None
+        self._host_el = None
+
+    def poll(self):
+        """Read whatever was appended since the last call and return the new (host, PortService) pairs."""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return []  # nmap has not created it yet
+        if size < self._offset:
+            self._reset()
+        if size == self._offset:
+            return []
+
+        with open(self.path, "rb") as fh:
+            fh.seek(self._offset)
+            data = fh.read(size - self._offset)
+        self._offset += len(data)
+        return self._feed_jsonl(data) if self.jsonl else self._feed_xml(data)
+
+    def follow(self, stop=None):
+        """Yield lists of new (host, PortService) pairs until 'stop' (a threading.Event) is set."""
+        while stop is None or not stop.is_set():
+            updates = self.poll()
+            if updates:
+                yield updates
+            else:
+                time.sleep(self.poll_interval)
+
+    def _feed_xml(self, data):
+        updates = []
+        self._pull.feed(data)
+        for event, element in self._pull.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                elif element.tag == "host":
+                    self._host_el = element
+                continue
+
+            if element.tag == "port" and self._host_el is not None:
+                service = self._ports._parse_port_element(element)
+                if service:
+                    updates.append((self._ports._host_address(self._host_el), service))
+            elif element.tag == "host":
+                element.clear()
+                self._root.clear()
+                self._host_el = None
+        return updates
+
+    def _feed_jsonl(self, data):
+        updates = []
+        lines = (self._pending + data).split(b"\n")
+        self._pending = lines.pop()  # an incomplete last line waits for the rest of it
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                updates.extend(jsonl_services(json.loads(line)))
+            except (ValueError, TypeError, AttributeError):
+                self.errors += 1
+        return updates
+
+@functools.lru_cache(maxsize=None)
+def scale_lookup_table(scale_notes):
+    """
+    Port -> MIDI note table for a scale, given as its scales.conf string (e.g. "0,2,3,5,7,8,10").
+    The string is parsed once per scale and every possible port gets its note (degree = port % scale
+    length, shifted by OCT_SHIFT), so mapping a service to a note is a single lookup.
+    """
+    degrees = [int(note) + OCT_SHIFT for note in scale_notes.split(",")]
+    return bytes(degrees[port % len(degrees)] for port in range(65536))
+
+class KeywordMatcher:
+    """
+    Matches a text against many keywords at once (case-insensitive substring search).
+
+    Keywords are normalized once (whitespace and quotes stripped, lowercased) and compiled into an
+    Aho-Corasick automaton, so a search walks the text a single time no matter how many keywords
+    there are. search() returns the keyword that matched first in the text, so callers can show
+    why a step was accented.
+
+    Usage example:
+        matcher = KeywordMatcher(["'apache httpd 2'", "'PHP 5'"])
+        matcher.search("Apache httpd 2.4.41")  # -> 'apache httpd 2'
+    """
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(
+            cleaned for cleaned in (keyword.strip().strip("'\"").lower() for keyword in keywords) if cleaned
+        ))
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]
+
+        for keyword in self.keywords:
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(None)
+                node = next_node
+            if self._output[node] is None:
+                self._output[node] = keyword
+
+        # breadth-first pass: failure links, plus inheriting the output of the longest matching suffix
+        pending = collections.deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                if self._output[child] is None:
+                    self._output[child] = self._output[self._fail[child]]
+                pending.append(child)
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def search(self, text):
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        node = 0
+
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node] is not None:
+                return output[node]
+        return None
+
+class IncrementalSequencer:
+    """
+    Keeps one X03Sequence per host in step with a scan that is still running (see Manager.follow).
+
+    Steps are computed like Manager.build_sequences does (note from the scale lookup table, accent from the
+    keyword matcher, tie from the service text length, random octave jump), but one service at a time:
+    a new port takes a random free step, a port whose service changed recomputes its own step only, and
+    an unchanged port touches nothing. A host's sequence starts at 8 steps and grows to 16 on its 9th port;
+    ports past the 16th are ignored, as in build_sequences, unless rolling=True: then the port that was
+    least recently reported gives its step to the new one.
+    """
+    def __init__(self, manager, *, scale, keywords_path='./keywords.conf', seed=None, rolling=False):
+        self.rolling = rolling
+        self.port_notes = scale_lookup_table(scale["notes"])
+        self.accent_matcher = manager.keyword_matcher(keywords_path)
+        self.rng = random.Random(time.time() if seed is None else seed)
+        self.sequences = {}
+        self._steps = {}  # host -> {port: (step index, service fields)}
+
+    def update(self, host, service):
+        """Apply one discovered service. Returns the host's sequence if a step changed, else None."""
+        fields = (service.service_name, service.version)
+        steps = self._steps.setdefault(host, {})
+        sequence = self.sequences.get(host)
+        if sequence is None:
+            sequence = self.sequences[host] = X03Sequence(name=host, length=8, host=host)
+            for index in range(sequence.length):
+                sequence.mod_step(index, note=0, octave_mod=0, type='rest', accent=False)
+
+        known = steps.pop(service.port, None) if self.rolling else steps.get(service.port)
+        if known is not None:
+            if known[1] == fields:
+                steps[service.port] = known  # (re)inserted last: most recently reported
+                return None
+            index = known[0]
+        elif len(steps) >= 16:
+            if not self.rolling:
+                return None
+            index = steps.pop(next(iter(steps)))[0]
+        else:
+            if len(steps) == sequence.length:
+                self._grow(sequence)
+            used = {index for index, _ in steps.values()}
+            index = self.rng.choice([index for index in range(sequence.length) if index not in used])
+
+        text = f"{service.service_name} {service.version}"
+        trigger = self.accent_matcher.search(text)
+        sequence.mod_step(index, note=self.port_notes[service.port], octave_mod=self.rng.choices((0, 1, -1), weights=(2, 1, 1))[0],
+                          type='tie' if len(text) > TIE_THRESHOLD else 'active', accent=trigger is not None)
+        sequence.set_source(index, f"{service.port}:{service.service_name}", trigger or "")
+        steps[service.port] = (index, fields)
+        return sequence
+
+    @staticmethod
+    def _grow(sequence):
+        sequence.sequence.extend(Step(note=0, type='rest') for _ in range(16 - sequence.length))
+        sequence.length = 16
+
+class IngestServer:
+    """
+    Local asyncio listener that turns streamed service events into rolling sequences, one per source.
+
+    Other tools send newline-delimited JSON objects such as {"port": 22, "service_name": "ssh", "version": ...,
+    "banner": ...} over TCP, UDP or a Unix socket; an optional "source" field names the sequence, otherwise
+    the sender's address does. Events are decoded into PortService objects and fed to a rolling
+    IncrementalSequencer.
+
+    Bursts are absorbed in two ways: updates for a (source, port) that is still waiting to be applied are
+    coalesced into the pending one, and at most 'queue_size' distinct updates wait at a time - past that,
+    TCP and Unix readers stop reading (so senders are slowed down by the socket buffers) and UDP datagrams
+    are dropped and counted. The consumer applies everything waiting in one batch and calls on_update once
+    per batch, off the playback thread.
+
+    Usage example:
+        server = IngestServer(IncrementalSequencer(manager, scale=scale, rolling=True), on_update=print)
+        server.run()  # until Ctrl+C
+        # elsewhere: echo '{"port": 22, "service_name": "ssh"}' | nc 127.0.0.1 5303
+    """
+    def __init__(self, sequencer, *, host="127.0.0.1", port=INGEST_PORT, udp=True, unix_path=None,
+                 queue_size=INGEST_QUEUE_SIZE, on_update=None):
+        self.sequencer = sequencer
+        self.host = host
+        self.port = port
+        self.udp = udp
+        self.unix_path = unix_path
+        self.queue_size = queue_size
+        self.on_update = on_update
+        self.stats = {"received": 0, "coalesced": 0, "dropped": 0, "invalid": 0, "applied": 0}
+        self._queue = None
+        self._latest = {}
+
+    def run(self, stop=None):
+        asyncio.run(self.serve(stop))
+
+    async def serve(self, stop=None):
+        """Listen until 'stop' (a threading.Event) is set or the task is cancelled."""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        loop = asyncio.get_running_loop()
+        servers = [await asyncio.start_server(self._handle_stream, self.host, self.port)]
+        if self.unix_path:
+            servers.append(await asyncio.start_unix_server(self._handle_stream, self.unix_path))
+        transport = None
+        if self.udp:
+            transport, _ = await loop.create_datagram_endpoint(lambda: _IngestDatagramProtocol(self), local_addr=(self.host, self.port))
+        consumer = asyncio.create_task(self._consume())
+
+        try:
+            while stop is None or not stop.is_set():
+                await asyncio.sleep(0.1)
+        finally:
+            consumer.cancel()
+            if transport is not None:
+                transport.close()
+            for server in servers:
+                server.close()
+                await server.wait_closed()
+
+    async def _handle_stream(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        default_source = peer[0] if isinstance(peer, tuple) else "unix"
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                event = self._decode(line, default_source)
+                if event is not None and self._coalesce(*event):
+                    await self._queue.put(event[0])  # blocks while the queue is full: backpressure
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            self.stats["invalid"] += 1
+        finally:
+            writer.close()
+
+    def _accept_datagram(self, data, address):
+        for line in data.splitlines():
+            event = self._decode(line, address[0])
+            if event is None:
+                continue
+            if not self._coalesce(*event):
+                continue
+            try:
+                self._queue.put_nowait(event[0])
+            except asyncio.QueueFull:
+                del self._latest[event[0]]
+                self.stats["dropped"] += 1
+
+    def _decode(self, line, default_source):
+        if not line.strip():
+            return None
+        try:
+            record = json.loads(line)
+            service = PortService.from_dict(record)
+        except (ValueError, TypeError, AttributeError):
+            self.stats["invalid"] += 1
+            return None
+        self.stats["received"] += 1
+        source = str(record.get("source") or default_source)
+        return (source, service.port), service
+
+    def _coalesce(self, key, service):
+        """Store the newest service for 'key'. Returns True when the key still has to be queued."""
+        pending = key in self._latest
+        self._latest[key] = service
+        if pending:
+            self.stats["coalesced"] += 1
+        return not pending
+
+    async def _consume(self):
+        while True:
+            keys = [await self._queue.get()]
+            while not self._queue.empty():
+                keys.append(self._queue.get_nowait())
+
+            changed = {}
+            for key in keys:
+                source, _ = key
+                try:
+                    sequence = self.sequencer.update(source, self._latest.pop(key))
+                except Exception as exc:  # one bad event must not stop the consumer, or the queue fills and readers block
+                    print(f"Warning: skipped event for {source} port {key[1]}: {exc!r}", file=sys.stderr)
+                    self.stats["invalid"] += 1
+                    continue
+                self.stats["applied"] += 1
+                if sequence is not None:
+                    changed[source] = sequence
+            if changed and self.on_update is not None:
+                self.on_update(changed)
+
+class _IngestDatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        self.server._accept_datagram(data, addr)
+
+class SequenceLibrary:
+    """
+    Persistent, append-only store of generated sequences.
+
+    Sequences are appended as one JSON line each to 'sequences.jsonl' (steps plus their source metadata),
+    and a sidecar 'sequences.idx' gets one [offset, created, name, host] line per sequence. Nothing is read
+    when the library is opened: the index is loaded on first use, and sequences are decoded one by one
+    straight out of a memory map of the data file, so even a 100k-pattern library opens instantly and
+    pages cheaply. If the index falls behind the data (e.g. after a crash mid-save), it is caught up from
+    the data file on load.
+
+    Usage example:
+        library = SequenceLibrary()
+        library.save(seq)
+        for position in library.find(host="10.0.0.5"):
+            print(library.load(position))
+    """
+    def __init__(self, directory=LIBRARY_DIR):
+        self.directory = Path(directory)
+        self.data_path = self.directory / "sequences.jsonl"
+        self.index_path = self.directory / "sequences.idx"
+        self._index = None
+        self._by_name = None
+        self._by_host = None
+        self._map = None
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def index(self):
+        """[offset, created, name, host] of every stored sequence, oldest first."""
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    def _load_index(self):
+        index = []
+        indexed_end = 0
+        if self.index_path.is_file():
+            data = self.index_path.read_bytes()
+            try:
+                # one json.loads call over the whole index is several times faster than one per line
+                index = json.loads(b"[" + data.rstrip(b"\n").replace(b"\n", b",") + b"]")
+            except ValueError:
+                for line in data.splitlines():
+                    try:
+                        index.append(json.loads(line))
+                    except ValueError:
+                        break  # torn last line: everything after it is rebuilt below
+        if index:
+            indexed_end = index[-1][0] + 1
+
+        # catch up with sequences saved after the index was last written
+        if self.data_path.is_file() and self.data_path.stat().st_size > indexed_end:
+            with open(self.data_path, "rb") as fh:
+                if index:
+                    fh.seek(index[-1][0])
+                    fh.readline()
+                missing = []
+                while True:
+                    offset = fh.tell()
+                    line = fh.readline()
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                        missing.append([offset, record["created"], record["name"], record["host"]])
+                    except (ValueError, KeyError, TypeError):
+                        continue  # a record torn by an interrupted save: skip it, keep the ones after it
+            if missing:
+                index.extend(missing)
+                self._write_index(index)
+        return index
+
+    def _write_index(self, index):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with atomic_output(self.index_path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                for entry in index:
+                    fh.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def save(self, sequence):
+        """Append one sequence. Returns its position in the library."""
+        return self.extend([sequence])[0]
+
+    def extend(self, sequences):
+        """Append many sequences with one write to each file. Returns their positions."""
+        index = self.index
+        created = time.time()
+        records = []
+        entries = []
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.data_path, "ab") as data_fh:
+            offset = data_fh.tell()
+            if offset and not self._ends_with_newline():
+                data_fh.write(b"\n")  # close a record torn by an interrupted save instead of gluing onto it
+                offset += 1
+            for sequence in sequences:
+                record = {
+                    "name": sequence.name,
+                    "host": sequence.host,
+                    "created": created,
+                    "steps": [[step.note, step.octave_mod, step_type_code(step.type), step.accent, step.source, step.trigger] for step in sequence.sequence],
+                }
+                line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+                records.append(line)
+                entries.append([offset, created, sequence.name, sequence.host])
+                offset += len(line)
+            data_fh.write(b"".join(records))
+
+        with open(self.index_path, "a", encoding="utf-8") as index_fh:
+            index_fh.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+
+        first = len(index)
+        index.extend(entries)
+        self._by_name = self._by_host = None
+        return list(range(first, len(index)))
+
+    def _ends_with_newline(self):
+        with open(self.data_path, "rb") as fh:
+            fh.seek(-1, os.SEEK_END)
+            return fh.read(1) == b"\n"
+
+    def load(self, position, packed=False):
+        """Decode the sequence stored at 'position' (as a PackedX03Sequence with packed=True)."""
+        offset = self.index[position][0]
+        if self._map is None or offset >= len(self._map):
+            self._remap()
+        end = self._map.find(b"\n", offset)
+        record = json.loads(self._map[offset:end])
+
+        steps = record["steps"]
+        sequence_class = PackedX03Sequence if packed else X03Sequence
+        sequence = sequence_class(name=record["name"], length=len(steps), host=record["host"])
+        for index, (note, octave_mod, type_code, accent, source, trigger) in enumerate(steps):
+            sequence.mod_step(index, note=note, octave_mod=octave_mod, type=STEP_TYPE_NAMES[type_code], accent=accent)
+            sequence.set_source(index, source, trigger)
+        return sequence
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+        with open(self.data_path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def page(self, number, size=LIBRARY_PAGE_SIZE):
+        """(position, created, name, host) of the entries on page 'number' (0-based), without decoding any sequence."""
+        start = number * size
+        return [(position, created, name, host) for position, (_, created, name, host) in enumerate(self.index[start:start + size], start=start)]
+
+    def find(self, name=None, host=None, since=None):
+        """Positions of the sequences matching every criterion given ('since' is a time.time() timestamp)."""
+        if self._by_name is None:
+            self._by_name = collections.defaultdict(list)
+            self._by_host = collections.defaultdict(list)
+            for position, (_, _, entry_name, entry_host) in enumerate(self.index):
+                self._by_name[entry_name].append(position)
+                self._by_host[entry_host].append(position)
+
+        if name is not None:
+            positions = self._by_name.get(name, [])
+        elif host is not None:
+            positions = self._by_host.get(host, [])
+        else:
+            positions = range(len(self.index))
+
+        index = self.index
+        return [
+            position for position in positions
+            if (host is None or index[position][3] == host)
+            and (since is None or index[position][1] >= since)
+        ]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
 class Manager:
-    def __init__(self):
+    def __init__(self, library=None):
         self.name = "scan2acid manager"
         self.sequences = []
+        self.songs = []
+        self.port_pool = PortPool()
+        self.player = BackgroundPlayer(self.port_pool)
+        self.parse_cache = ParseCache()
+        self.library = library
+        self._keyword_matchers = {}
     
     def print_help(self):
         print("Available commands:")
@@ -776,17 +3113,34 @@ class Manager:
         print("  demo           - Play a demo sequence (with MIDI sync)")
         print("  parse          - Parses an nmap XML file (nmap -sV --open --top-ports 16 -oX file.xml <target>).")
         print("                     > After parsing, you can choose to convert the scan into a 303 sequence.")
+        print("  cache stats    - Show parse cache statistics (hits, misses, size)")
+        print("  cache clear    - Invalidate the parse cache")
         print("  list midi      - List available MIDI output interfaces")
-        print("  list sequences - List available sequences")
+        print("  list sequences - List this session's sequences, then page through the library of saved ones")
+        print("  follow         - Follow an nmap XML/JSONL file while the scan runs, updating one sequence per host")
+        print("                     > Updates are heard at the next bar when the background player is running.")
+        print(f"  serve          - Listen for NDJSON service events (TCP/UDP port {INGEST_PORT}) and build a rolling sequence per source")
+        print("  load           - Load sequences from the library by #position, name or host")
+        print("  list songs     - List available songs (chained patterns generated from whole scans)")
         print("  play           - Play a sequence (interactive menu)")
+        print("  play multi     - Play several sequences at once, each on its own port/channel, sharing one clock")
+        print("  play song      - Play a song, pattern after pattern (interactive menu)")
+        print("  play bg        - Loop a sequence in the background while the prompt stays available")
+        print("                     > New sequences (and 'swap') replace it at the next bar.")
+        print("  swap           - Queue another sequence for the background playback (next bar)")
+        print("  stop           - Stop the background playback")
         print("  export         - Export a sequence to a file (interactive menu)")
+        print("  export midi    - Render several sequences into one multi-track MIDI file (interactive menu)")
+        print("  export song    - Export a song to HTML pages and a MIDI file (interactive menu)")
+        print("  export bank    - Put sequences into TD-3 pattern slots: save one .syx file and/or upload it to the device")
         print("  exit, quit, q  - Exit the prompt")
 
     def play_demo_sequence(self):
-        options = mido.get_output_names()
+        options = self.port_pool.names()
         menu = TerminalMenu(options, title="Select a MIDI output interface for playback")
         menu_entry_index = menu.show()
         midi_interface = options[menu_entry_index]
+        self.port_pool.warm(midi_interface)
         
         print(">>> Playing demo sequence...")
         # da_funk = [55, 58, 55, 53, 39, 36, 48, 36, 51, 51, 53, 55, 58, 55, 48, 55]
@@ -811,93 +3165,263 @@ class Manager:
 
         print(df_seq)
 
-        df_seq.play(bpm=111, repetitions=4, send_clock=True, midi_interface=midi_interface, channel=1)
+        df_seq.play(bpm=111, repetitions=4, send_clock=True, midi_interface=midi_interface, channel=1, pool=self.port_pool)
 
-    def choose_scale(self):
+    def choose_scale(self, scale_name=None, scales_path='./scales.conf'):
         config = configparser.ConfigParser()
-        config.read('./scales.conf')
+        config.read(scales_path)
         scales = config.sections()
+        if scale_name is not None:
+            if scale_name not in config:
+                raise ValueError(f"Unknown scale '{scale_name}'. Available scales: {', '.join(scales)}")
+            return config[scale_name]
+
         menu = TerminalMenu(scales, title="Select a musical scale for mapping services to notes. Add your own on 'scales.conf'")
         menu_entry_index = menu.show()
         chosen_scale = scales[menu_entry_index]
         print(f"Chosen scale: {chosen_scale}")
         return config[chosen_scale]
     
+    def keyword_matcher(self, keywords_path='./keywords.conf'):
+        """Compiled accent matcher for a keywords file, rebuilt only when the file changes."""
+        path = Path(keywords_path)
+        try:
+            cache_key = (str(path.resolve()), path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Keywords file not found: {path}")
+
+        matcher = self._keyword_matchers.get(cache_key)
+        if matcher is None:
+            config = configparser.ConfigParser()
+            config.read(path)
+            matcher = KeywordMatcher(config['wordlists']['accents'].split(','))
+            self._keyword_matchers = {cache_key: matcher}
+        return matcher
+
     def is_accent(self, keywords, service):
-        service_full = f"{service.service_name} {service.version}".lower()
-        for keyword in keywords:
-            cleaned = keyword.strip().strip("'\"").lower()
-            if cleaned and cleaned in service_full:
-                return True
-        return False
+        return self.accent_keyword(keywords, service) is not None
+
+    def accent_keyword(self, keywords, service):
+        """Return the keyword (a list or a KeywordMatcher) that accents this service, or None."""
+        matcher = keywords if isinstance(keywords, KeywordMatcher) else KeywordMatcher(keywords)
+        return matcher.search(f"{service.service_name} {service.version}")
     
     def is_tie(self, service):
         service_full = f"{service.service_name} {service.version}"
         return len(service_full) > TIE_THRESHOLD
 
-    def to_303(self, services):
-        name = input("Enter a name for the new 303 sequence: ").strip() or "scan2acid import"
-        new_seq = X03Sequence(length=8 if len(services) <= 8 else 16, name=name)
-        random.seed(time.time())
-        random_qty = (8 - len(services)) if len(services) <= 8 else (16 - len(services))
-        
-        # fill the sequence with active and rest steps first
-        rests = []
-        for i in range(random_qty):
-            rand_rest = random.randint(0, new_seq.length - 1)
-            while rand_rest in rests:
-                rand_rest = random.randint(0, new_seq.length - 1)
-            rests.append(rand_rest)
-        for rest_index in rests:
-            new_seq.mod_step(index=rest_index, note=0, octave_mod=0, type='rest', accent=False)
-        
-        # now we specify the notes themselves
+    def to_303(self, services, *, name=None, scale=None, keywords_path='./keywords.conf', seed=None, verbose=True, packed=False, host=""):
+        """
+        Turn a list of PortService objects into a new X03Sequence (also appended to self.sequences).
+        Without 'name' or 'scale' the user is asked interactively; 'scale' can be a scales.conf section
+        or its name. A fixed 'seed' makes rest placement and octave jumps reproducible, and packed=True
+        stores the result as a compact PackedX03Sequence. 'host' is the scanned host the services came from.
+        """
+        if name is None:
+            name = input("Enter a name for the new 303 sequence: ").strip() or "scan2acid import"
+        if scale is None or isinstance(scale, str):
+            scale = self.choose_scale(scale)
+        if verbose and len(services) > 16:
+            print(f"Warning: only the first 16 of {len(services)} services fit in one sequence; use a song to keep them all.", file=sys.stderr)
+
+        new_seq = self.build_sequences([(name, services)], scale=scale, keywords_path=keywords_path, seed=seed, packed=packed, hosts=[host])[0]
+        self.sequences.append(new_seq)
+        if self.player.is_playing:
+            self.player.queue(new_seq)
+            print(f"'{new_seq.name}' queued: it takes over the background playback at the next bar.")
+        # new_seq.play(midi_interface="Onyx Producer 2-2:Onyx Producer 2-2 MIDI 1 28:0", bpm=133, repetitions=2, send_clock=False, channel=1) # uncomment this line to auto-play the imported sequence - make sure to change the MIDI interface to your own! use s2a> list midi to see available interfaces
+        if verbose:
+            played_steps = [step for step in new_seq.sequence if step.type != 'rest']
+            print(f"Notes: {[step.note for step in played_steps]}")
+            print(f"Accents: {[step.accent for step in played_steps]}")
+            print(f"Ties: {[step.type == 'tie' for step in played_steps]}")
+            print(new_seq)
+        return new_seq
+
+    def batch_to_303(self, hosts, *, scale, keywords_path='./keywords.conf', seed=None, packed=True, name_format="scan {host}"):
+        """
+        Generate one sequence per host in a single pass, e.g. from Parser.get_hosts() or Scanner.host_results.
+        'hosts' maps a host to its list of PortService objects. The new sequences (packed by default) are
+        appended to self.sequences and returned in host order.
+        """
+        if isinstance(scale, str):
+            scale = self.choose_scale(scale)
+        groups = [(name_format.format(host=host), services) for host, services in hosts.items()]
+        new_seqs = self.build_sequences(groups, scale=scale, keywords_path=keywords_path, seed=seed, packed=packed, hosts=list(hosts))
+        self.sequences.extend(new_seqs)
+        return new_seqs
+
+    def to_song(self, hosts, *, name="scan2acid song", scale, keywords_path='./keywords.conf', seed=None, packed=False, pattern_steps=16):
+        """
+        Turn a whole scan into a Song: hosts are kept apart, and each host's services are split into
+        chained patterns of up to 'pattern_steps' services instead of dropping everything past 16.
+        'hosts' maps a host to its PortService list (Parser.get_hosts(), Scanner.host_results) - a plain
+        list of services is treated as a single host. The song is appended to self.songs and returned.
+        """
+        if isinstance(scale, str):
+            scale = self.choose_scale(scale)
+        if not isinstance(hosts, dict):
+            hosts = {"": list(hosts)}
+
+        groups = []
+        group_hosts = []
+        for host, services in hosts.items():
+            chunks = [services[start:start + pattern_steps] for start in range(0, len(services), pattern_steps)] or [[]]
+            for index, chunk in enumerate(chunks, start=1):
+                label = f"{host} " if host else ""
+                groups.append((f"{name} - {label}[{index}/{len(chunks)}]", chunk))
+                group_hosts.append(host)
+
+        patterns = self.build_sequences(groups, scale=scale, keywords_path=keywords_path, seed=seed, packed=packed, hosts=group_hosts)
+
+        song = Song(name=name, patterns=patterns)
+        self.songs.append(song)
+        return song
+
+    def follow(self, path, *, scale, keywords_path='./keywords.conf', seed=None, stop=None, midi_interface=None,
+               bpm=120, channel=1, send_clock=False, verbose=True):
+        """
+        Follow a scan that is still being written (see ScanFollower) and keep one sequence per host up to date
+        (see IncrementalSequencer). With 'midi_interface' the first sequence starts looping on the background
+        player; while the player runs, every updated sequence is queued and takes over at the next bar.
+        Runs until 'stop' is set or Ctrl+C. The final sequences are added to self.sequences (and the library)
+        and returned as {host: sequence}.
+        """
+        sequencer = IncrementalSequencer(self, scale=scale, keywords_path=keywords_path, seed=seed)
+        follower = ScanFollower(path)
+        if verbose:
+            print(f">>> Following {path} (Ctrl+C to stop)")
 
-        config = configparser.ConfigParser()
-        config.read('./keywords.conf')
-        accent_keywords = config['wordlists']['accents'].split(',')
-        scale = self.choose_scale()
-        notes = []
-        accents = []
-        ties = []
-        sources = []
-        scale_notes = scale["notes"].split(",")
+        try:
+            for updates in follower.follow(stop):
+                changed = {}
+                for host, service in updates:
+                    sequence = sequencer.update(host, service)
+                    if sequence is not None:
+                        changed[host] = sequence
+                        if verbose:
+                            print(f"  [{host}] {service}")
+
+                for sequence in changed.values():
+                    if verbose:
+                        print(sequence)
+                    if self.player.is_playing:
+                        self.player.queue(sequence)
+                    elif midi_interface is not None:
+                        self.player.start(sequence, midi_interface=midi_interface, bpm=bpm, channel=channel, send_clock=send_clock)
+        except KeyboardInterrupt:
+            pass
+
+        sequences = list(sequencer.sequences.values())
+        self.sequences.extend(sequences)
+        if self.library is not None and sequences:
+            self.library.extend(sequences)
+        if verbose:
+            print(f">>> Stopped following: {len(sequences)} host sequences")
+        return sequencer.sequences
+
+    def serve(self, *, scale, keywords_path='./keywords.conf', seed=None, host="127.0.0.1", port=INGEST_PORT, udp=True,
+              unix_path=None, stop=None, midi_interface=None, bpm=120, channel=1, send_clock=False, verbose=True):
+        """
+        Run an IngestServer until 'stop' is set or Ctrl+C, keeping a rolling sequence per event source.
+        Playback works as in follow(): the most recently updated sequence is queued on the background player
+        (started on 'midi_interface' if given). Returns {source: sequence}.
+        """
+        sequencer = IncrementalSequencer(self, scale=scale, keywords_path=keywords_path, seed=seed, rolling=True)
+
+        def on_update(changed):
+            if verbose:
+                for source, sequence in changed.items():
+                    print(f"  [{source}] {sequence}")
+            latest = list(changed.values())[-1]
+            if self.player.is_playing:
+                self.player.queue(latest)
+            elif midi_interface is not None:
+                self.player.start(latest, midi_interface=midi_interface, bpm=bpm, channel=channel, send_clock=send_clock)
+
+        server = IngestServer(sequencer, host=host, port=port, udp=udp, unix_path=unix_path, on_update=on_update)
+        if verbose:
+            print(f">>> Listening for NDJSON service events on {host}:{port} (TCP{'/UDP' if udp else ''}"
+                  f"{f', unix:{unix_path}' if unix_path else ''}). Ctrl+C to stop.")
+        try:
+            server.run(stop)
+        except KeyboardInterrupt:
+            pass
+
+        sequences = list(sequencer.sequences.values())
+        self.sequences.extend(sequences)
+        if self.library is not None and sequences:
+            self.library.extend(sequences)
+        if verbose:
+            stats = server.stats
+            print(f">>> Server stopped: {stats['received']} events ({stats['coalesced']} coalesced, {stats['dropped']} dropped, "
+                  f"{stats['invalid']} invalid), {len(sequences)} source sequences")
+        return sequencer.sequences
+
+    def build_sequences(self, groups, *, scale, keywords_path='./keywords.conf', seed=None, packed=False, hosts=None):
+        """
+        Map services to steps for many sequences at once. 'groups' is a list of (name, services); only the
+        first 16 services of a group fit in a sequence (use to_song() to chain longer lists). 'hosts', if
+        given, holds the host of each group and is set on the sequences before they reach the library.
+
+        All services are flattened into one port array and one list of "name version" strings. Notes come
+        from the scale's precomputed port -> note lookup table, and accents, ties and octave jumps are each
+        computed in one go over the flat data. Only the final step filling is done per sequence.
+        """
+        port_notes = scale_lookup_table(scale["notes"])
+        accent_matcher = self.keyword_matcher(keywords_path)
+        rng = random.Random(time.time() if seed is None else seed)
+
+        groups = [(name, services[:16]) for name, services in groups]
+        flat = [service for _, services in groups for service in services]
+        texts = [f"{service.service_name} {service.version}" for service in flat]
+
+        # ports are wrapped into the table's 0-65535 range, so a bogus port from a scan file still gets a note
+        notes = bytes(map(port_notes.__getitem__, array.array('H', [service.port % 65536 for service in flat])))
+        triggers = list(map(accent_matcher.search, texts))
+        ties = [text_length > TIE_THRESHOLD for text_length in map(len, texts)]
+        # octave jumps are the only truly random part: 0 half of the time, +1 or -1 otherwise
+        octave_mods = rng.choices((0, 1, -1), weights=(2, 1, 1), k=len(flat))
+
+        new_seqs = []
+        position = 0
+        for group_index, (name, services) in enumerate(groups):
+            length = 8 if len(services) <= 8 else 16
+            host = hosts[group_index] if hosts is not None else ""
+            new_seq = PackedX03Sequence(name=name, length=length, host=host) if packed else X03Sequence(name=name, length=length, host=host)
+            rests = set(rng.sample(range(length), length - len(services)))
+
+            for index in range(length):
+                if index in rests:
+                    new_seq.mod_step(index=index, note=0, octave_mod=0, type='rest', accent=False)
+                    continue
 
-        for service in services:
-            # specify notes
-            degree = service.port % len(scale_notes)
-            note = (int(scale_notes[degree])) + OCT_SHIFT # shift to a more reasonable octave
-            notes.append(note)
-            # specify accents
-            accents.append(self.is_accent(accent_keywords, service))
-            ties.append(self.is_tie(service))
-            sources.append(f"{service.port}:{service.service_name}")
-        
-        print(f"Notes: {notes}")
-        print(f"Accents: {accents}")
-        print(f"Ties: {ties}")
-        
+                service = flat[position]
+                trigger = triggers[position]
+                new_seq.mod_step(index=index, note=notes[position], octave_mod=octave_mods[position], type='tie' if ties[position] else 'active', accent=trigger is not None)
+                new_seq.set_source(index, f"{service.port}:{service.service_name}", trigger or "")
+                position += 1
 
-        for step in new_seq.sequence:
-            if step.type == 'active':
-                step.note = notes.pop(0)
-                step.accent = accents.pop(0)
-                step.octave_mod = 0 if random.randint(0,1) == 1 else (1 if random.randint(0,1) == 1 else -1)
-                step.type = 'tie' if ties.pop(0) else 'active'
-                step.source = sources.pop(0)
+            new_seqs.append(new_seq)
 
-        self.sequences.append(new_seq)
-        # new_seq.play(midi_interface="Onyx Producer 2-2:Onyx Producer 2-2 MIDI 1 28:0", bpm=133, repetitions=2, send_clock=False, channel=1) # uncomment this line to auto-play the imported sequence - make sure to change the MIDI interface to your own! use s2a> list midi to see available interfaces
-        print(new_seq)
+        if self.library is not None:
+            self.library.extend(new_seqs)
+        return new_seqs
 
     def prompt(self):
 
         print("scan2acid 0.1 - a 303-style sequence manipulating tool.")
         print("   made with <3 by Hack the Music | @hackingmusic")
+        if self.library is None:
+            # everything generated from the prompt is kept for the next session
+            self.library = SequenceLibrary()
         while True:
             cmd = input("s2a> ").strip().lower()
             if cmd in {'exit', 'quit', 'q'}:
                 print("Exiting scan2acid.")
+                self.player.stop()
+                self.port_pool.close_all()
+                self.library.close()
                 break
 
             elif cmd == 'help':
@@ -906,44 +3430,341 @@ class Manager:
             elif cmd == 'demo':
                 self.play_demo_sequence()
             
+            elif cmd == 'cache stats':
+                stats = self.parse_cache.stats()
+                print(f"Parse cache ({self.parse_cache.directory}): {stats['entries']} entries, {stats['bytes'] / 1024:.1f} KiB of {stats['max_bytes'] / (1024 * 1024):.0f} MiB")
+                print(f"  hits: {stats['hits']}, misses: {stats['misses']}")
+
+            elif cmd == 'cache clear':
+                print(f"Removed {self.parse_cache.clear()} cached scans.")
+
             elif cmd == 'list midi':
                 print("Available MIDI output interfaces:")
-                for name in mido.get_output_names():
-                    print(f"  {name}")
+                for name in self.port_pool.names(refresh=True):
+                    print(f"  {name}{' (open)' if name in self.port_pool else ''}")
             
             elif cmd == 'list sequences':
                 if not self.sequences:
-                    print("No sequences available.")
+                    print("No sequences in this session.")
                 else:
-                    print("Available sequences:")
+                    print("Sequences in this session:")
                     for idx, seq in enumerate(self.sequences):
                         print(f"  [{idx}] {seq.name} - {seq.length} steps")
-            
+
+                total = len(self.library)
+                pages = (total + LIBRARY_PAGE_SIZE - 1) // LIBRARY_PAGE_SIZE
+                print(f"Library ({self.library.directory}): {total} sequences")
+                for page_number in range(pages):
+                    for position, created, name, host in self.library.page(page_number):
+                        print(f"  #{position} {time.strftime('%Y-%m-%d %H:%M', time.localtime(created))}  {name}{f' ({host})' if host else ''}")
+                    if page_number + 1 < pages and input(f"-- page {page_number + 1}/{pages}, Enter for more, q to stop -- ").strip().lower() == 'q':
+                        break
+
+            elif cmd == 'follow':
+                path = input("Enter the nmap XML or JSONL file being written (nmap ... -oX file.xml): ").strip()
+                scale = self.choose_scale()
+                midi_interface = None
+                if not self.player.is_playing and input("Play the updates live? (y/n, default n): ").strip().lower() == 'y':
+                    midi_options = self.port_pool.names()
+                    midi_menu = TerminalMenu(midi_options, title="Select a MIDI output interface for playback")
+                    midi_interface = midi_options[midi_menu.show()]
+                    self.port_pool.warm(midi_interface)
+                self.follow(path, scale=scale, midi_interface=midi_interface)
+                if self.player.is_playing:
+                    print("Background playback keeps running. Type 'stop' to end it.")
+
+            elif cmd == 'serve':
+                scale = self.choose_scale()
+                port_input = input(f"Enter the port to listen on (default {INGEST_PORT}): ").strip()
+                try:
+                    port = int(port_input) if port_input else INGEST_PORT
+                except ValueError:
+                    port = INGEST_PORT
+                midi_interface = None
+                if not self.player.is_playing and input("Play the updates live? (y/n, default n): ").strip().lower() == 'y':
+                    midi_options = self.port_pool.names()
+                    midi_menu = TerminalMenu(midi_options, title="Select a MIDI output interface for playback")
+                    midi_interface = midi_options[midi_menu.show()]
+                    self.port_pool.warm(midi_interface)
+                try:
+                    self.serve(scale=scale, port=port, midi_interface=midi_interface)
+                except OSError as exc:
+                    print(f"Error: {exc}")
+                if self.player.is_playing:
+                    print("Background playback keeps running. Type 'stop' to end it.")
+
+            elif cmd == 'load':
+                query = input("Enter library #position, sequence name or host to load: ").strip()
+                if query.startswith('#') and query[1:].isdigit():
+                    positions = [int(query[1:])] if int(query[1:]) < len(self.library) else []
+                else:
+                    positions = self.library.find(name=query) or self.library.find(host=query)
+                if not positions:
+                    print(f"Nothing in the library matches '{query}'.")
+                    continue
+
+                loaded = [self.library.load(position) for position in positions]
+                self.sequences.extend(loaded)
+                print(f"Loaded {len(loaded)} sequence{'s' if len(loaded) != 1 else ''} into this session.")
+
+            elif cmd == 'play bg':
+                if not self.sequences:
+                    print("No sequences available to play.")
+                    continue
+                if self.player.is_playing:
+                    print(f"Already playing '{self.player.now_playing}' in the background. Use 'swap' or 'stop'.")
+                    continue
+
+                menu = TerminalMenu([seq.name for seq in self.sequences], title="Select a sequence to loop in the background")
+                selected_seq = self.sequences[menu.show()]
+
+                midi_options = self.port_pool.names()
+                midi_menu = TerminalMenu(midi_options, title="Select a MIDI output interface for playback")
+                midi_interface = midi_options[midi_menu.show()]
+                self.port_pool.warm(midi_interface)
+
+                bpm_input = input("Enter BPM (default 120): ").strip()
+                try:
+                    bpm = int(bpm_input) if bpm_input else 120
+                except ValueError:
+                    bpm = 120
+
+                channel_input = input("Enter MIDI channel (1-16, default 1): ").strip()
+                try:
+                    channel = int(channel_input) if channel_input else 1
+                    if not (1 <= channel <= 16):
+                        raise ValueError
+                except ValueError:
+                    channel = 1
+                channel -= 1  # mido numbers channels 0-15
+
+                clock_input = input("Send MIDI clock? (y/n, default n): ").strip().lower()
+                self.player.start(selected_seq, midi_interface=midi_interface, bpm=bpm, channel=channel, send_clock=clock_input == 'y')
+                print(f">>> Looping '{selected_seq.name}' in the background. Type 'stop' to end it.")
+
+            elif cmd == 'swap':
+                if not self.player.is_playing:
+                    print("Nothing is playing in the background. Use 'play bg' first.")
+                    continue
+
+                menu = TerminalMenu([seq.name for seq in self.sequences], title=f"Select the sequence that replaces '{self.player.now_playing}'")
+                selected_seq = self.sequences[menu.show()]
+                self.player.queue(selected_seq)
+                print(f"'{selected_seq.name}' queued for the next bar.")
+
+            elif cmd == 'stop':
+                if not self.player.is_playing:
+                    print("Nothing is playing in the background.")
+                    continue
+                self.player.stop()
+                print(">>> Background playback stopped.")
+
+            elif cmd == 'list songs':
+                if not self.songs:
+                    print("No songs available.")
+                else:
+                    print("Available songs:")
+                    for idx, song in enumerate(self.songs):
+                        print(f"  [{idx}] {song.name} - {len(song)} patterns, {song.length} steps")
+
+            elif cmd == 'play song':
+                if not self.songs:
+                    print("No songs available to play.")
+                    continue
+
+                menu = TerminalMenu([song.name for song in self.songs], title="Select a song to play")
+                selected_song = self.songs[menu.show()]
+
+                midi_options = self.port_pool.names()
+                midi_menu = TerminalMenu(midi_options, title="Select a MIDI output interface for playback")
+                midi_interface = midi_options[midi_menu.show()]
+                self.port_pool.warm(midi_interface)  # opens the port while the remaining questions are answered
+
+                bpm_input = input("Enter BPM (default 120): ").strip()
+                try:
+                    bpm = int(bpm_input) if bpm_input else 120
+                except ValueError:
+                    bpm = 120
+
+                channel_input = input("Enter MIDI channel (1-16, default 1): ").strip()
+                try:
+                    channel = int(channel_input) if channel_input else 1
+                    if not (1 <= channel <= 16):
+                        raise ValueError
+                except ValueError:
+                    channel = 1
+                channel -= 1  # mido numbers channels 0-15
+
+                repetitions_input = input("Enter repetitions of each pattern (default 1): ").strip()
+                try:
+                    repetitions = int(repetitions_input) if repetitions_input else 1
+                    if repetitions < 1:
+                        raise ValueError
+                except ValueError:
+                    repetitions = 1
+
+                clock_input = input("Send MIDI clock? (y/n, default n): ").strip().lower()
+                selected_song.play(repetitions=repetitions, midi_interface=midi_interface, bpm=bpm, channel=channel, send_clock=clock_input == 'y', pool=self.port_pool)
+
+            elif cmd == 'export midi':
+                if not self.sequences:
+                    print("No sequences available to export.")
+                    continue
+
+                options = [seq.name for seq in self.sequences]
+                menu = TerminalMenu(options, title="Select the sequences to render, one MIDI track each (space to select, enter to confirm)", multi_select=True, show_multi_select_hint=True)
+                selected_indexes = menu.show()
+                if not selected_indexes:
+                    continue
+
+                bpm_input = input("Enter BPM (default 120): ").strip()
+                try:
+                    bpm = int(bpm_input) if bpm_input else 120
+                except ValueError:
+                    bpm = 120
+
+                repetitions_input = input("Enter number of repetitions (default 4): ").strip()
+                try:
+                    repetitions = int(repetitions_input) if repetitions_input else 4
+                    if repetitions < 1:
+                        raise ValueError
+                except ValueError:
+                    repetitions = 4
+
+                engine = PlaybackEngine(bpm=bpm)
+                for channel, seq_index in enumerate(selected_indexes):
+                    engine.add(self.sequences[seq_index], midi_interface=None, channel=channel % 16, repetitions=repetitions)
+
+                name_input = input("Enter filename to export (without extension): ").strip()
+                Path("exports").mkdir(exist_ok=True)
+                engine.render(Path("exports") / f"{name_input}.mid")
+                print(f"Exported {len(engine.tracks)} tracks to exports/{name_input}.mid")
+
+            elif cmd == 'export song':
+                if not self.songs:
+                    print("No songs available to export.")
+                    continue
+
+                menu = TerminalMenu([song.name for song in self.songs], title="Select a song to export")
+                selected_song = self.songs[menu.show()]
+
+                name_input = input(f"Enter filename to export (without extension) for '{selected_song.name}': ").strip()
+                pages = selected_song.to_html(f"{name_input}.html", title=selected_song.name)
+                selected_song.to_midi(filename=Path("exports") / f"{name_input}.mid")
+                write_html_index("exports")
+                print(f"Exported song to {pages[0].name} (linking {len(pages) - 1} pattern pages) and {name_input}.mid")
+
+            elif cmd == 'export bank':
+                if not self.sequences:
+                    print("No sequences available to export.")
+                    continue
+
+                options = [seq.name for seq in self.sequences]
+                menu = TerminalMenu(options, title="Select up to 64 sequences, filling group 1 pattern 1 onwards (space to select, enter to confirm)", multi_select=True, show_multi_select_hint=True)
+                selected_indexes = menu.show()
+                if not selected_indexes:
+                    continue
+
+                try:
+                    bank = SysExBank(self.sequences[index] for index in selected_indexes)
+                except ValueError as exc:
+                    print(f"Error: {exc}")
+                    continue
+
+                name_input = input("Enter filename to export (without extension, empty to skip): ").strip()
+                if name_input:
+                    Path("exports").mkdir(exist_ok=True)
+                    bank.to_sysex(Path("exports") / f"{name_input}.syx")
+                    print(f"Exported {len(bank)} patterns to exports/{name_input}.syx")
+
+                upload_input = input("Upload the bank to the TD-3 now? (y/n, default n): ").strip().lower()
+                if upload_input == 'y':
+                    midi_options = self.port_pool.names()
+                    midi_menu = TerminalMenu(midi_options, title="Select the MIDI output the TD-3 is connected to")
+                    midi_interface = midi_options[midi_menu.show()]
+                    verify_input = input("Verify by reading every pattern back? (y/n, default n): ").strip().lower()
+                    verify_interface = None
+                    if verify_input == 'y':
+                        input_options = mido.get_input_names()
+                        if input_options:
+                            input_menu = TerminalMenu(input_options, title="Select the MIDI input the TD-3 answers on")
+                            verify_interface = input_options[input_menu.show()]
+                        else:
+                            print("No MIDI inputs available; uploading without verification.")
+                    bank.upload(midi_interface, verify_interface=verify_interface, pool=self.port_pool)
+
             elif cmd == 'scan':
-                target = input("Enter target IP or hostname to scan: ").strip()
+                target = input("Enter target IP/hostname, CIDR range, comma-separated list or @file to scan: ").strip()
                 scanner = Scanner(target=target)
-                print(f"Scanning {target}...")
-                results = scanner.scan()
-                if results:
-                    print(f"Found {len(results)} open ports/services:")
+                try:
+                    hosts = scanner.expand_targets()
+                except ValueError as exc:
+                    print(f"Error: {exc}")
+                    continue
+
+                if len(hosts) == 1:
+                    scanner = Scanner(target=hosts[0])
+                    print(f"Scanning {hosts[0]}...")
+                    try:
+                        results = scanner.scan(concurrent=True)
+                    except ValueError as exc:
+                        print(f"Error: {exc}")
+                        continue
+                    if results:
+                        print(f"Found {len(results)} open ports/services:")
+                        for service in results:
+                            print(f"  {service}")
+                    else:
+                        print("No open ports found.")
+                    continue
+
+                # sweep: results stream in per host, sequences are generated while the rest is still being probed
+                to_303_choice = input(f"Sweeping {len(hosts)} hosts. Import each host as a 303 sequence? (y/n): ").strip().lower()
+                scale = self.choose_scale() if to_303_choice == 'y' else None
+
+                for host, results in scanner.sweep():
+                    if not results:
+                        continue
+                    print(f"{host}: {len(results)} open ports/services")
                     for service in results:
                         print(f"  {service}")
-                else:
-                    print("No open ports found.")
+                    if scale is not None:
+                        self.to_303(results, name=f"scan {host}", scale=scale, packed=True, host=host)
+
+                for host, error in scanner.sweep_errors.items():
+                    print(f"Error: {error}")
+                print(f"Sweep finished: {len(scanner.host_results)} hosts scanned, {sum(1 for r in scanner.host_results.values() if r)} with open ports.")
 
             elif cmd == 'parse':
                 xml_path = input("Enter path to Nmap XML file: ").strip()
-                parser = Parser(xml_path=xml_path)
+                parser = Parser(xml_path=xml_path, cache=self.parse_cache)
                 try:
                     services = parser.parse()
                     if services:
                         print(f"Parsed {len(services)} services from {xml_path}:")
                         for service in services:
                             print(f"  {service}")
+                        hosts = parser.get_hosts()
                         to_303_choice = input("Import as 303 sequence? (y/n): ").strip().lower()
-                        
-                        if to_303_choice == 'y':
-                            self.to_303(services)
+
+                        if to_303_choice == 'y' and (len(hosts) > 1 or len(services) > 16):
+                            import_modes = [
+                                "Song: one or more chained 16-step patterns per host",
+                                f"One sequence per host ({len(hosts)} hosts, up to 16 services each)",
+                                "Single sequence (first 16 services only)",
+                            ]
+                            mode = TerminalMenu(import_modes, title=f"{len(services)} services on {len(hosts)} hosts").show()
+                            if mode == 0:
+                                song_name = input("Enter a name for the new song: ").strip() or Path(xml_path).stem
+                                song = self.to_song(hosts, name=song_name, scale=self.choose_scale())
+                                print(song)
+                            elif mode == 1:
+                                new_seqs = self.batch_to_303(hosts, scale=self.choose_scale())
+                                print(f"Imported {len(new_seqs)} sequences.")
+                            elif mode == 2:
+                                self.to_303(services)
+                        elif to_303_choice == 'y':
+                            self.to_303(services, host=next(iter(hosts), ""))
                         
                     else:
                         print("No services found in the XML file.")
@@ -961,10 +3782,11 @@ class Manager:
                 menu_entry_index = menu.show()
                 selected_seq = self.sequences[menu_entry_index]
 
-                midi_options = mido.get_output_names()
+                midi_options = self.port_pool.names()
                 midi_menu = TerminalMenu(midi_options, title="Select a MIDI output interface for playback")
                 midi_entry_index = midi_menu.show()
                 midi_interface = midi_options[midi_entry_index]
+                self.port_pool.warm(midi_interface)  # opens the port while the remaining questions are answered
 
                 bpm_input = input("Enter BPM (default 120): ").strip()
                 try:
@@ -979,6 +3801,7 @@ class Manager:
                         raise ValueError
                 except ValueError:
                     channel = 1
+                channel -= 1  # mido numbers channels 0-15
 
                 repetitions_input = input("Enter number of repetitions (default 4; 0 = infinite): ").strip()
                 try:
@@ -991,8 +3814,59 @@ class Manager:
                 clock_input = input("Send MIDI clock? (y/n, default n): ").strip().lower()
                 send_clock = clock_input == 'y'
 
-                selected_seq.play(bpm=bpm, repetitions=repetitions, midi_interface=midi_interface, channel=channel, send_clock=send_clock)
+                telemetry_input = input("Report timing telemetry when playback ends? (y/n, default n): ").strip().lower()
+                telemetry = PlaybackTelemetry() if telemetry_input == 'y' else None
+
+                selected_seq.play(bpm=bpm, repetitions=repetitions, midi_interface=midi_interface, channel=channel, send_clock=send_clock, pool=self.port_pool, telemetry=telemetry)
             
+            elif cmd == 'play multi':
+                if not self.sequences:
+                    print("No sequences available to play.")
+                    continue
+
+                options = [seq.name for seq in self.sequences]
+                menu = TerminalMenu(options, title="Select the sequences to play together (space to select, enter to confirm)", multi_select=True, show_multi_select_hint=True)
+                selected_indexes = menu.show()
+                if not selected_indexes:
+                    continue
+
+                bpm_input = input("Enter BPM (default 120): ").strip()
+                try:
+                    bpm = int(bpm_input) if bpm_input else 120
+                except ValueError:
+                    bpm = 120
+
+                clock_input = input("Send MIDI clock? (y/n, default n): ").strip().lower()
+                engine = PlaybackEngine(bpm=bpm, send_clock=clock_input == 'y', pool=self.port_pool)
+
+                midi_options = self.port_pool.names()
+                for seq_index in selected_indexes:
+                    selected_seq = self.sequences[seq_index]
+                    midi_menu = TerminalMenu(midi_options, title=f"Select a MIDI output interface for '{selected_seq.name}'")
+                    midi_interface = midi_options[midi_menu.show()]
+                    self.port_pool.warm(midi_interface)
+
+                    channel_input = input(f"Enter MIDI channel for '{selected_seq.name}' (1-16, default 1): ").strip()
+                    try:
+                        channel = int(channel_input) if channel_input else 1
+                        if not (1 <= channel <= 16):
+                            raise ValueError
+                    except ValueError:
+                        channel = 1
+                    channel -= 1  # mido numbers channels 0-15
+
+                    repetitions_input = input(f"Enter number of repetitions for '{selected_seq.name}' (default 4; 0 = infinite): ").strip()
+                    try:
+                        repetitions = int(repetitions_input) if repetitions_input else 4
+                        if repetitions < 0:
+                            raise ValueError
+                    except ValueError:
+                        repetitions = 4
+
+                    engine.add(selected_seq, midi_interface=midi_interface, channel=channel, repetitions=repetitions)
+
+                engine.play()
+
             elif cmd == 'export':
                 if not self.sequences:
                     print("No sequences available to export.")
@@ -1005,11 +3879,421 @@ class Manager:
 
                 name_input = input(f"Enter filename to export (without extension) for '{selected_seq.name}': ").strip()
                 selected_seq.to_html(f"{name_input}.html", title=selected_seq.name)
-                print(f"Exported sequence to {name_input}.html")
+                write_html_index("exports")
+                print(f"Exported sequence to {name_input}.html (listed in exports/index.html)")
             
             else:
                 print(f"Unknown command: {cmd}. Type 'help' for a list of commands.")
 
+@contextlib.contextmanager
+def atomic_output(path):
+    """
+    Yield a temporary path next to 'path' and move it into place only once the block succeeds,
+    so readers never see a half-written export.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+def collect_scan_files(inputs, patterns=None):
+    """
+    Expand files, directories and glob expressions into a sorted list of scan files. Directories are matched
+    against 'patterns' (default: every suffix registered in SCAN_FORMATS, e.g. *.xml, *.gnmap, *.json).
+    """
+    if patterns is None:
+        patterns = [f"*{suffix}" for _, suffixes, _ in SCAN_FORMATS.values() for suffix in suffixes]
+    files = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            files.extend(candidate for pattern in patterns for candidate in path.glob(pattern) if candidate.is_file())
+        elif path.is_file():
+            files.append(path)
+        else:
+            files.extend(Path(match) for match in glob.glob(str(item), recursive=True) if Path(match).is_file())
+    return sorted(dict.fromkeys(files))
+
+@functools.lru_cache(maxsize=1)
+def _batch_manager():
+    """The Manager of a batch worker process, kept for all of its files so the keyword matcher is compiled once."""
+    return Manager()
+
+def convert_scan(xml_path, output_stem, options):
+    """
+    Batch worker: parse one scan, turn it into a 303 sequence and export it in every requested format.
+    Runs inside a process pool, so it only takes and returns plain picklable values.
+    """
+    try:
+        manager = _batch_manager()
+        scale = manager.choose_scale(options["scale"], options["scales_path"])
+        services = Parser(xml_path).parse()
+        if not services:
+            return {"path": str(xml_path), "services": 0, "outputs": [], "error": "no services found"}
+
+        seed = None if options["seed"] is None else f"{options['seed']}:{Path(xml_path).name}"
+        new_seq = manager.to_303(services, name=output_stem, scale=scale, keywords_path=options["keywords_path"], seed=seed, verbose=False)
+        manager.sequences.clear()  # the worker's manager outlives this file
+
+        out_dir = Path(options["out_dir"])
+        outputs = []
+        for export_format in options["formats"]:
+            target = out_dir / f"{output_stem}.{BATCH_EXTENSIONS[export_format]}"
+            with atomic_output(target) as tmp_path:
+                if export_format == "html":
+                    new_seq.to_html(tmp_path.name, title=new_seq.name, directory=out_dir)
+                elif export_format == "midi":
+                    new_seq.to_midi(bpm=options["bpm"], channel=options["channel"], filename=tmp_path)
+                elif export_format == "sysex":
+                    new_seq.to_sysex(filename=tmp_path)
+            outputs.append(str(target))
+
+        return {"path": str(xml_path), "services": len(services), "outputs": outputs, "error": None}
+    except Exception as exc:
+        return {"path": str(xml_path), "services": 0, "outputs": [], "error": f"{type(exc).__name__}: {exc}"}
+
+def run_batch(inputs, *, scale, out_dir="exports", formats=("html",), workers=None, seed=None, bpm=120, channel=0,
+              scales_path="./scales.conf", keywords_path="./keywords.conf", verbose=True):
+    """
+    Convert many scans at once: every file goes through parse -> to_303 -> export on a ProcessPoolExecutor.
+    Results are written atomically into 'out_dir', plus an index.html linking the HTML exports. Returns a summary dict with per-file failures and throughput.
+    """
+    for export_format in formats:
+        if export_format not in BATCH_EXTENSIONS:
+            raise ValueError(f"Unknown export format '{export_format}'. Available formats: {', '.join(BATCH_EXTENSIONS)}")
+    Manager().choose_scale(scale, scales_path)  # fail before spawning workers
+
+    files = collect_scan_files(inputs)
+    if not files:
+        raise ValueError("No scan files found")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    options = {
+        "scale": scale,
+        "scales_path": scales_path,
+        "keywords_path": keywords_path,
+        "seed": seed,
+        "out_dir": str(out_dir),
+        "formats": tuple(formats),
+        "bpm": bpm,
+        "channel": channel,
+    }
+
+    # files with the same name from different directories get a numbered suffix instead of overwriting each other
+    stems = {}
+    jobs = []
+    for xml_path in files:
+        count = stems.get(xml_path.stem, 0)
+        stems[xml_path.stem] = count + 1
+        jobs.append((xml_path, xml_path.stem if count == 0 else f"{xml_path.stem}_{count + 1}"))
+
+    started = time.perf_counter()
+    failures = []
+    converted = 0
+    services_total = 0
+    pages = []
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(convert_scan, str(xml_path), stem, options) for xml_path, stem in jobs]
+        for done, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+            result = future.result()
+            if result["error"]:
+                failures.append((result["path"], result["error"]))
+                if verbose:
+                    print(f"[{done}/{len(jobs)}] FAILED {result['path']}: {result['error']}")
+            else:
+                converted += 1
+                services_total += result["services"]
+                pages.extend((Path(output).name, Path(output).stem, f"{result['path']} - {result['services']} services")
+                             for output in result["outputs"] if output.endswith(".html"))
+                if verbose:
+                    print(f"[{done}/{len(jobs)}] {result['path']} -> {', '.join(result['outputs'])}")
+
+    if pages:
+        write_html_index(out_dir, sorted(pages), title=f"scan2acid batch - {len(pages)} sequences")
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "files": len(jobs),
+        "converted": converted,
+        "failed": len(failures),
+        "failures": failures,
+        "services": services_total,
+        "seconds": elapsed,
+        "files_per_second": len(jobs) / elapsed if elapsed > 0 else 0.0,
+    }
+    if verbose:
+        print(f"Batch finished: {converted}/{len(jobs)} files converted, {len(failures)} failed, "
+              f"{elapsed:.2f}s ({summary['files_per_second']:.1f} files/s, {services_total} services)")
+    return summary
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="scan2acid",
+        description="scan2acid - a 303-style sequence manipulating tool. Run without arguments for the interactive prompt.",
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+
+    generation = argparse.ArgumentParser(add_help=False)
+    generation.add_argument("input", help="scan file: nmap XML (nmap -sV --open --top-ports 16 -oX file.xml <target>) or grepable, masscan JSON or list, JSONL")
+    generation.add_argument("--format", dest="scan_format", choices=sorted(SCAN_FORMATS), help="scan file format (default: detected)")
+    generation.add_argument("--scale", required=True, help="scale section from the scales file (e.g. d_minor)")
+    generation.add_argument("--scales-file", default="./scales.conf", help="scales file (default: ./scales.conf)")
+    generation.add_argument("--keywords", default="./keywords.conf", help="accent keywords file (default: ./keywords.conf)")
+    generation.add_argument("--seed", type=int, help="random seed for rest placement and octave jumps")
+    generation.add_argument("--name", help="sequence name (default: input file name)")
+    generation.add_argument("--song", action="store_true", help="keep every service: one or more chained 16-step patterns per host")
+
+    playback = argparse.ArgumentParser(add_help=False)
+    playback.add_argument("--bpm", type=int, default=120, help="tempo (default: 120)")
+    playback.add_argument("--channel", type=int, default=1, choices=range(1, 17), metavar="1-16", help="MIDI channel (default: 1)")
+
+    parse_cmd = subparsers.add_parser("parse", help="parse a scan file and print its services")
+    parse_cmd.add_argument("input", help="scan file (nmap XML or grepable, masscan JSON or list, JSONL)")
+    parse_cmd.add_argument("--format", dest="scan_format", choices=sorted(SCAN_FORMATS), help="scan file format (default: detected)")
+    parse_cmd.add_argument("--json", action="store_true", help="print services as JSON")
+    parse_cmd.add_argument("--jsonl", action="store_true", help="print one JSON line per service, with its host (the 'jsonl' scan format)")
+
+    scan_cmd = subparsers.add_parser("scan", help="scan a host, CIDR range, host list or @file")
+    scan_cmd.add_argument("target", help="host, CIDR range, comma-separated list or @file")
+    scan_cmd.add_argument("--ports", help="comma-separated ports (default: top 16)")
+    scan_cmd.add_argument("--timeout", type=float, default=1.0, help="connect/read timeout in seconds (default: 1.0)")
+    scan_cmd.add_argument("--json", action="store_true", help="print services as JSON")
+
+    subparsers.add_parser("generate", parents=[generation], help="generate a 303 sequence from a scan and print it")
+
+    export_cmd = subparsers.add_parser("export", help="generate a 303 sequence from a scan and export it")
+    export_formats = export_cmd.add_subparsers(dest="format", metavar="format", required=True)
+    html_cmd = export_formats.add_parser("html", parents=[generation], help="HTML table")
+    html_cmd.add_argument("-o", "--output", required=True, help="output .html file")
+    midi_cmd = export_formats.add_parser("midi", parents=[generation, playback], help="standard MIDI file")
+    midi_cmd.add_argument("-o", "--output", required=True, help="output .mid file")
+    midi_cmd.add_argument("--repetitions", type=int, default=1, help="times the sequence is repeated (default: 1)")
+    sysex_cmd = export_formats.add_parser("sysex", parents=[generation], help="TD-3 pattern SysEx")
+    sysex_cmd.add_argument("-o", "--output", required=True, help="output .syx file")
+    sysex_cmd.add_argument("--group", type=int, default=0, choices=range(4), metavar="0-3", help="TD-3 pattern group (default: 0)")
+    sysex_cmd.add_argument("--pattern", type=int, default=0, choices=range(16), metavar="0-15", help="TD-3 pattern slot (default: 0)")
+
+    play_cmd = subparsers.add_parser("play", parents=[generation, playback], help="generate a 303 sequence from a scan and play it")
+    play_cmd.add_argument("--port", help="MIDI output port (default: first available; see 'list-midi')")
+    play_cmd.add_argument("--repetitions", type=int, default=4, help="repetitions, 0 = infinite (default: 4)")
+    play_cmd.add_argument("--clock", action="store_true", help="send MIDI clock (start/stop + 24 PPQ)")
+    play_cmd.add_argument("--telemetry", nargs="?", const="", metavar="FILE", help="report send timing (lateness/jitter p50/p99/max) when playback ends; with FILE, also save it as JSON")
+
+    batch_cmd = subparsers.add_parser("batch", help="convert a whole directory/glob of scans using all cores")
+    batch_cmd.add_argument("inputs", nargs="+", help="scan files, directories (every known scan file suffix) or glob patterns")
+    batch_cmd.add_argument("--scale", required=True, help="scale section from the scales file (e.g. d_minor)")
+    batch_cmd.add_argument("--scales-file", default="./scales.conf", help="scales file (default: ./scales.conf)")
+    batch_cmd.add_argument("--keywords", default="./keywords.conf", help="accent keywords file (default: ./keywords.conf)")
+    batch_cmd.add_argument("--seed", type=int, help="random seed (combined with each file name)")
+    batch_cmd.add_argument("--formats", default="html", help="comma-separated export formats: html, midi, sysex (default: html)")
+    batch_cmd.add_argument("--out", default="exports", help="output directory (default: exports)")
+    batch_cmd.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    batch_cmd.add_argument("--bpm", type=int, default=120, help="tempo for MIDI exports (default: 120)")
+    batch_cmd.add_argument("--channel", type=int, default=1, choices=range(1, 17), metavar="1-16", help="MIDI channel for MIDI exports (default: 1)")
+
+    follow_cmd = subparsers.add_parser("follow", help="follow an nmap XML/JSONL file while the scan runs and update sequences live")
+    follow_cmd.add_argument("input", help="scan file being written (nmap ... -oX file.xml, or a .jsonl of services)")
+    follow_cmd.add_argument("--scale", required=True, help="scale section from the scales file (e.g. d_minor)")
+    follow_cmd.add_argument("--scales-file", default="./scales.conf", help="scales file (default: ./scales.conf)")
+    follow_cmd.add_argument("--keywords", default="./keywords.conf", help="accent keywords file (default: ./keywords.conf)")
+    follow_cmd.add_argument("--seed", type=int, help="random seed for step placement and octave jumps")
+    follow_cmd.add_argument("--port", help="MIDI output port to play the updates on (default: no playback)")
+    follow_cmd.add_argument("--bpm", type=int, default=120, help="tempo (default: 120)")
+    follow_cmd.add_argument("--channel", type=int, default=1, choices=range(1, 17), metavar="1-16", help="MIDI channel (default: 1)")
+    follow_cmd.add_argument("--clock", action="store_true", help="send MIDI clock (start/stop + 24 PPQ)")
+
+    serve_cmd = subparsers.add_parser("serve", help="listen for NDJSON service events and build a rolling sequence per source")
+    serve_cmd.add_argument("--scale", required=True, help="scale section from the scales file (e.g. d_minor)")
+    serve_cmd.add_argument("--scales-file", default="./scales.conf", help="scales file (default: ./scales.conf)")
+    serve_cmd.add_argument("--keywords", default="./keywords.conf", help="accent keywords file (default: ./keywords.conf)")
+    serve_cmd.add_argument("--seed", type=int, help="random seed for step placement and octave jumps")
+    serve_cmd.add_argument("--listen", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    serve_cmd.add_argument("--listen-port", type=int, default=INGEST_PORT, help=f"TCP/UDP port (default: {INGEST_PORT})")
+    serve_cmd.add_argument("--no-udp", action="store_true", help="only accept TCP connections")
+    serve_cmd.add_argument("--unix", metavar="PATH", help="also listen on this Unix socket")
+    serve_cmd.add_argument("--port", help="MIDI output port to play the updates on (default: no playback)")
+    serve_cmd.add_argument("--bpm", type=int, default=120, help="tempo (default: 120)")
+    serve_cmd.add_argument("--channel", type=int, default=1, choices=range(1, 17), metavar="1-16", help="MIDI channel (default: 1)")
+    serve_cmd.add_argument("--clock", action="store_true", help="send MIDI clock (start/stop + 24 PPQ)")
+
+    bank_cmd = subparsers.add_parser("bank", help="build a TD-3 bank (4 groups x 16 patterns) from many scans and/or upload it")
+    bank_cmd.add_argument("inputs", nargs="+", help="scan files, directories (every known scan file suffix) or glob patterns")
+    bank_cmd.add_argument("--scale", required=True, help="scale section from the scales file (e.g. d_minor)")
+    bank_cmd.add_argument("--scales-file", default="./scales.conf", help="scales file (default: ./scales.conf)")
+    bank_cmd.add_argument("--keywords", default="./keywords.conf", help="accent keywords file (default: ./keywords.conf)")
+    bank_cmd.add_argument("--seed", type=int, help="random seed (combined with each file name)")
+    bank_cmd.add_argument("--song", action="store_true", help="add every host's chained patterns instead of one pattern per scan")
+    bank_cmd.add_argument("--group", type=int, default=0, choices=range(4), metavar="0-3", help="first TD-3 group to fill (default: 0)")
+    bank_cmd.add_argument("-o", "--output", help="output .syx file")
+    bank_cmd.add_argument("--upload", metavar="PORT", help="send the bank to this MIDI output port")
+    bank_cmd.add_argument("--verify", metavar="PORT", help="read every pattern back through this MIDI input port")
+    bank_cmd.add_argument("--gap", type=float, default=SYSEX_GAP, help=f"pause after each pattern in seconds (default: {SYSEX_GAP})")
+
+    subparsers.add_parser("list-midi", help="list available MIDI output interfaces")
+    return parser
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if getattr(args, "channel", None) is not None:
+        args.channel -= 1  # --channel is 1-16 on the command line, mido numbers channels 0-15
+    manager = Manager()
+
+    if args.command is None:
+        manager.prompt()
+        return 0
+
+    try:
+        if args.command == "list-midi":
+            for name in mido.get_output_names():
+                print(name)
+
+        elif args.command == "batch":
+            formats = [export_format.strip() for export_format in args.formats.split(",") if export_format.strip()]
+            summary = run_batch(args.inputs, scale=args.scale, out_dir=args.out, formats=formats, workers=args.workers,
+                                seed=args.seed, bpm=args.bpm, channel=args.channel,
+                                scales_path=args.scales_file, keywords_path=args.keywords)
+            return 1 if summary["failed"] else 0
+
+        elif args.command == "follow":
+            scale = manager.choose_scale(args.scale, args.scales_file)
+            try:
+                manager.follow(args.input, scale=scale, keywords_path=args.keywords, seed=args.seed, midi_interface=args.port,
+                               bpm=args.bpm, channel=args.channel, send_clock=args.clock)
+            finally:
+                manager.player.stop()
+                manager.port_pool.close_all()
+
+        elif args.command == "serve":
+            scale = manager.choose_scale(args.scale, args.scales_file)
+            try:
+                manager.serve(scale=scale, keywords_path=args.keywords, seed=args.seed, host=args.listen, port=args.listen_port,
+                              udp=not args.no_udp, unix_path=args.unix, midi_interface=args.port, bpm=args.bpm,
+                              channel=args.channel, send_clock=args.clock)
+            finally:
+                manager.player.stop()
+                manager.port_pool.close_all()
+
+        elif args.command == "bank":
+            if not args.output and not args.upload:
+                raise ValueError("Nothing to do: give an output file (-o) and/or a port to --upload to")
+
+            scale = manager.choose_scale(args.scale, args.scales_file)
+            bank = SysExBank(first_group=args.group)
+            for path in collect_scan_files(args.inputs):
+                parser = Parser(path, cache=manager.parse_cache)
+                services = parser.parse()
+                if not services:
+                    print(f"Skipping {path}: no services found", file=sys.stderr)
+                    continue
+
+                seed = None if args.seed is None else f"{args.seed}:{path.name}"
+                if args.song:
+                    patterns = manager.to_song(parser.get_hosts(), name=path.stem, scale=scale, keywords_path=args.keywords, seed=seed).patterns
+                else:
+                    patterns = [manager.to_303(services, name=path.stem, scale=scale, keywords_path=args.keywords, seed=seed, verbose=False)]
+                try:
+                    for pattern in patterns:
+                        bank.add(pattern)
+                except ValueError as exc:
+                    print(f"Warning: {exc}; stopping at {path}", file=sys.stderr)
+                    break
+
+            if not len(bank):
+                raise ValueError("No patterns to put in the bank")
+            if args.output:
+                output_path = Path(args.output)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                bank.to_sysex(output_path)
+                print(f"Exported {len(bank)} patterns to {output_path}")
+            if args.upload:
+                summary = bank.upload(args.upload, gap=args.gap, verify_interface=args.verify)
+                return 1 if summary["failed"] else 0
+
+        elif args.command == "parse":
+            parser = Parser(args.input, cache=manager.parse_cache, format=args.scan_format)
+            services = parser.parse()
+            if args.jsonl:
+                for host, host_services in parser.get_hosts().items():
+                    for service in host_services:
+                        print(json.dumps({"host": host, **service.as_dict()}))
+            elif args.json:
+                print(json.dumps([service.as_dict() for service in services], indent=2))
+            else:
+                for service in services:
+                    print(service)
+
+        elif args.command == "scan":
+            ports = [port for port in args.ports.split(",") if port.strip()] if args.ports else None
+            scanner = Scanner(target=args.target)
+            results = {}
+            for host, services in scanner.sweep(ports=ports, timeout=args.timeout):
+                results[host] = services
+                if not args.json:
+                    print(f"{host}: {len(services)} open ports/services")
+                    for service in services:
+                        print(f"  {service}")
+            for error in scanner.sweep_errors.values():
+                print(f"Error: {error}", file=sys.stderr)
+            if args.json:
+                print(json.dumps({host: [service.as_dict() for service in services] for host, services in results.items()}, indent=2))
+
+        else:
+            scale = manager.choose_scale(args.scale, args.scales_file)
+            parser = Parser(args.input, cache=manager.parse_cache, format=args.scan_format)
+            services = parser.parse()
+            if not services:
+                raise ValueError(f"No services found in {args.input}")
+
+            name = args.name or Path(args.input).stem
+            if args.song:
+                new_seq = manager.to_song(parser.get_hosts(), name=name, scale=scale, keywords_path=args.keywords, seed=args.seed)
+                if args.command == "generate":
+                    print(new_seq)
+            else:
+                new_seq = manager.to_303(services, name=name, scale=scale, keywords_path=args.keywords, seed=args.seed, verbose=args.command == "generate")
+
+            if args.command == "export":
+                output_path = Path(args.output)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                if args.format == "html":
+                    new_seq.to_html(output_path.name, title=new_seq.name, directory=output_path.parent)
+                elif args.format == "midi":
+                    new_seq.to_midi(bpm=args.bpm, channel=args.channel, repetitions=args.repetitions, filename=output_path)
+                elif args.format == "sysex" and args.song:
+                    new_seq.to_sysex(group=args.group, first_pattern=args.pattern, filename=output_path)
+                elif args.format == "sysex":
+                    new_seq.to_sysex(group=args.group, pattern=args.pattern, filename=output_path)
+                else:
+                    raise ValueError(f"Unknown export format '{args.format}'")
+                print(f"Exported '{new_seq.name}' to {output_path}")
+
+            elif args.command == "play":
+                midi_interface = args.port
+                if midi_interface is None:
+                    outputs = mido.get_output_names()
+                    if not outputs:
+                        raise ValueError("No MIDI output interfaces available")
+                    midi_interface = outputs[0]
+                print(new_seq)
+                manager.port_pool.warm(midi_interface, channel=args.channel)
+                telemetry = PlaybackTelemetry() if args.telemetry is not None else None
+                try:
+                    new_seq.play(repetitions=args.repetitions, midi_interface=midi_interface, bpm=args.bpm, channel=args.channel, send_clock=args.clock, pool=manager.port_pool, telemetry=telemetry)
+                finally:
+                    manager.port_pool.close_all()
+                if telemetry is not None and args.telemetry:
+                    print(f"Timing telemetry saved to {telemetry.export(args.telemetry)}")
+
+    except (FileNotFoundError, ValueError, ET.ParseError, OSError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    return 0
+
 if __name__ == "__main__":
-    cli = Manager()
-    cli.prompt()
+    sys.exit(main())